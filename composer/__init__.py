@@ -1 +1 @@
-
+default_app_config = "composer.apps.ComposerConfig"
@@ -10,9 +10,8 @@ from django.template.loaders import app_directories
 
 import nested_admin
 
-from composer.models import Column, Row, Slot, Tile
-from composer.templatetags.composer_tags import ComposerNode
-from composer.utils import get_view_choices
+from composer.models import CACHE_VARY_CHOICES, Column, Row, Slot, Tile
+from composer.utils import get_template_slot_names, get_view_choices
 
 
 class TileInlineForm(forms.ModelForm):
@@ -37,6 +36,18 @@ class TileInlineForm(forms.ModelForm):
         styles.sort()
         self.fields["style"].widget = forms.widgets.Select(choices=styles)
 
+        self.fields["cache_vary"] = forms.MultipleChoiceField(
+            choices=CACHE_VARY_CHOICES,
+            help_text=self.fields["cache_vary"].help_text,
+            required=False,
+            widget=forms.widgets.CheckboxSelectMultiple
+        )
+        if self.instance.cache_vary:
+            self.initial["cache_vary"] = self.instance.cache_vary.split(",")
+
+    def clean_cache_vary(self):
+        return ",".join(self.cleaned_data["cache_vary"]) or None
+
     def get_existing_styles(self, current_styles):
         """return list(tuple("key", "val"), ...)
         self -- current inline form instance.
@@ -199,10 +210,10 @@ class SlotAdminForm(forms.ModelForm):
         super(SlotAdminForm, self).__init__(*args, **kwargs)
 
         # Get the choices from the base template.
-        nodelist = loader.get_template("base.html").template.nodelist
-        composer_nodes = nodelist.get_nodes_by_type(ComposerNode)
-        slot_name_choices = [[i.slot_name, i.slot_name]
-                for i in composer_nodes]
+        slot_names = get_template_slot_names(
+            loader.get_template("base.html").template
+        )
+        slot_name_choices = [[i, i] for i in slot_names]
 
         # The help text on the widget needs to be carried over.
         slot_name_help = self.fields["slot_name"].help_text
@@ -0,0 +1,113 @@
+"""Render composer pages from asyncio code, eg. on ASGI workers.
+
+Requires Python 3.5 or later, so nothing in composer imports this module.
+
+Django has neither an async ORM nor async views in the versions composer
+supports, so database access and template rendering run on a thread pool to
+keep the event loop free. The rows of all slots on a page are fetched
+together, after which the view tiles of all slots are rendered concurrently.
+Views that are coroutine functions are awaited on the event loop. The page
+template is rendered last and picks up the rows and tiles that were prepared.
+"""
+import asyncio
+import functools
+
+try:
+    from django.urls import NoReverseMatch
+except ImportError:
+    from django.core.urlresolvers import NoReverseMatch
+from django.template.loader import get_template
+
+from composer.context_processors import slots
+from composer.parallel import (
+    call_with_request, get_executor, get_view_tiles, render_placeholder
+)
+from composer.templatetags.composer_tags import TileNode
+from composer.trees import get_rows
+from composer.utils import (
+    get_setting, get_template_slot_names, resolve_view_name
+)
+
+
+async def run_sync(request, func, *args):
+    """Call a synchronous function on the thread pool."""
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(
+        get_executor(),
+        functools.partial(call_with_request, request, func, *args)
+    )
+
+
+def fetch_rows(request, template):
+    """Resolve the slots of all composer tags in template and fetch their
+    rows. Return a dictionary of slot id to rows.
+    """
+
+    composer_slots = slots(request)["composer_slots"]
+    names = get_template_slot_names(template)
+    composer_slots.declare(names)
+    found = [composer_slots[name] for name in names if name in composer_slots]
+    if not hasattr(request, "_composer_rows"):
+        request._composer_rows = {}
+    request._composer_rows.update(get_rows(found))
+    return dict((slot.id, request._composer_rows[slot.id]) for slot in found)
+
+
+async def render_async_view(node, context, tile, view, args, kwargs):
+    request = context["request"]
+    final_kwargs = node._get_view_kwargs(context, tile, kwargs)
+    request._composer_suppress_rows_tag = 1
+    result = await view(request, *args, **final_kwargs)
+    content = await run_sync(request, node._render_response, context, result)
+    return await run_sync(
+        request, node._render_content, context, tile, content
+    )
+
+
+async def render_tile(node, context, tile):
+    try:
+        view, args, kwargs = resolve_view_name(tile.view_name)
+    except NoReverseMatch:
+        return "No reverse match for %s" % tile.view_name
+    if asyncio.iscoroutinefunction(view):
+        coroutine = render_async_view(node, context, tile, view, args, kwargs)
+    else:
+        coroutine = run_sync(
+            context["request"], node.render_cached, context, tile
+        )
+    try:
+        return await asyncio.wait_for(coroutine, get_setting("tile-timeout"))
+    except asyncio.TimeoutError:
+        return render_placeholder(tile)
+
+
+async def prerender_tiles(request, rows_map):
+    """Render the view tiles of all slots concurrently. Every tile gets its
+    own copy of the context it is rendered in when the slot is rendered.
+    """
+
+    node = TileNode("tile")
+    tiles = []
+    coroutines = []
+    for rows in rows_map.values():
+        for tile, context in get_view_tiles(request, rows):
+            tiles.append(tile)
+            coroutines.append(render_tile(node, context, tile))
+
+    if not hasattr(request, "_composer_prerendered"):
+        request._composer_prerendered = {}
+    for tile, html in zip(tiles, await asyncio.gather(*coroutines)):
+        request._composer_prerendered[tile.id] = html
+
+
+async def render_to_string(template_name, context=None, *, request):
+    """Like django.template.loader.render_to_string, but prepare the slots of
+    the template without blocking the event loop. The request is required
+    because slots are resolved for it.
+    """
+
+    template = get_template(template_name)
+    rows_map = await run_sync(request, fetch_rows, request, template.template)
+    await prerender_tiles(request, rows_map)
+    return await run_sync(request, template.render, context, request)
@@ -1,7 +1,39 @@
 from __future__ import unicode_literals
 
 from django.apps import AppConfig
+from django.core import checks
+from django.core.signals import setting_changed
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_save
+)
+try:
+    from django.utils.autoreload import file_changed
+except ImportError:
+    # Django < 2.2
+    file_changed = None
 
 
 class ComposerConfig(AppConfig):
     name = "composer"
+
+    def ready(self):
+        from composer import receivers
+        from composer.checks import check_cache
+        from composer.models import Column, Row, Slot, Tile
+
+        checks.register(check_cache)
+
+        for signal in (post_save, post_delete):
+            signal.connect(receivers.on_slot_changed, sender=Slot)
+            signal.connect(receivers.on_row_changed, sender=Row)
+            signal.connect(receivers.on_column_changed, sender=Column)
+            signal.connect(receivers.on_tile_changed, sender=Tile)
+            signal.connect(receivers.on_model_changed)
+        for model in (Row, Column, Tile):
+            pre_save.connect(receivers.on_tree_node_saving, sender=model)
+        m2m_changed.connect(
+            receivers.on_slot_sites_changed, sender=Slot.sites.through
+        )
+        setting_changed.connect(receivers.on_setting_changed)
+        if file_changed is not None:
+            file_changed.connect(receivers.on_file_changed)
@@ -0,0 +1,227 @@
+"""Helpers for the values composer shares between processes through the
+Django cache framework.
+
+Composer never stores anything that can not be rebuilt from the database, so
+any cache backend will do. Values are invalidated by bumping a version token
+instead of deleting keys, which allows processes to detect that something
+they keep in memory is out of date.
+
+Values that are expensive to build are stored together with the version they
+were built for and the time until which they are fresh. When such a value is
+out of date only the process holding a short lived lock key rebuilds it.
+Other processes keep serving the previous value meanwhile, so a popular slot
+being edited does not make every process hit the database at once.
+"""
+import time
+import uuid
+
+from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import translation
+
+from composer.utils import get_setting
+
+
+def get_cache():
+    return caches[get_setting("cache", "default")]
+
+
+def make_key(*parts):
+    return "composer:" + ":".join(str(part) for part in parts)
+
+
+def get_version(*parts):
+    """Return the current version token for parts, creating one if needed."""
+
+    cache = get_cache()
+    key = make_key("version", *parts)
+    version = cache.get(key)
+    if version is None:
+        # Another process may be doing the same, so only the first add wins
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def get_versions(parts_list):
+    """Return the current version tokens for many parts in one round trip."""
+
+    cache = get_cache()
+    keys = [make_key("version", *parts) for parts in parts_list]
+    versions = cache.get_many(keys)
+    result = []
+    for parts, key in zip(parts_list, keys):
+        version = versions.get(key)
+        if version is None:
+            version = get_version(*parts)
+        result.append(version)
+    return result
+
+
+def bump_version(*parts):
+    """Invalidate everything that was built with the current version token.
+
+    Inside a transaction the token is changed again once the transaction is
+    committed. Other processes do not see the changed rows until then, so
+    anything they build in the meantime is invalidated as well.
+    """
+
+    key = make_key("version", *parts)
+
+    def bump():
+        get_cache().set(key, uuid.uuid4().hex, None)
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def pack(version, payload, timeout):
+    """Return the value to store for payload built for version."""
+
+    fresh_until = None if timeout is None else (time.time() + timeout)
+    return (version, payload, fresh_until)
+
+
+def is_fresh(value, version):
+    return (value is not None) and (value[0] == version) \
+        and ((value[2] is None) or (value[2] > time.time()))
+
+
+def get_stale_timeout(timeout):
+    """Values are kept by the backend for a grace period after they expire so
+    they can be served while they are rebuilt.
+    """
+
+    if timeout is None:
+        return None
+    return timeout + get_setting("stale-grace", 60)
+
+
+def set_packed(key, version, payload, timeout):
+    get_cache().set(
+        key, pack(version, payload, timeout), get_stale_timeout(timeout)
+    )
+
+
+def set_many_packed(items, timeout):
+    """Store many payloads. Items is a list of tuples (key, version,
+    payload).
+    """
+
+    get_cache().set_many(dict(
+        (key, pack(version, payload, timeout))
+        for key, version, payload in items
+    ), get_stale_timeout(timeout))
+
+
+def acquire_lock(key):
+    """Return True if this process may rebuild the value for key."""
+
+    return get_cache().add(
+        key + ":lock", 1, get_setting("lock-timeout", 10)
+    )
+
+
+def release_lock(key):
+    get_cache().delete(key + ":lock")
+
+
+def wait_for(key, version):
+    """Wait for another process to store the value for key and version.
+    Return the value, or None if it did not appear before the lock expired.
+    """
+
+    cache = get_cache()
+    deadline = time.time() + get_setting("lock-timeout", 10)
+    while time.time() < deadline:
+        time.sleep(0.05)
+        value = cache.get(key)
+        if (value is not None) and (value[0] == version):
+            return value
+        if cache.get(key + ":lock") is None:
+            break
+    return None
+
+
+def get_or_build(key, version, build, timeout):
+    """Return the payload stored under key for version. If there is none, or
+    it is no longer fresh, call build to create it. Only one process builds
+    at a time. Others return the previous payload if there is one or wait
+    for the new one.
+    """
+
+    value = get_cache().get(key)
+    if is_fresh(value, version):
+        return value[1]
+
+    if not acquire_lock(key):
+        if value is not None:
+            return value[1]
+        value = wait_for(key, version)
+        if value is not None:
+            return value[1]
+        # The other process failed or is slow. Build it ourselves.
+        return build()
+
+    try:
+        payload = build()
+        set_packed(key, version, payload, timeout)
+    finally:
+        release_lock(key)
+    return payload
+
+
+def get_tile_cache_key(tile, request):
+    """Return the key the rendered tile is cached under for this request. The
+    key does not change with the tile's version so the previous HTML can be
+    served while a changed tile is rendered.
+    """
+
+    parts = ["tile", tile.id]
+    for vary in (tile.cache_vary or "").split(","):
+        vary = vary.strip()
+        if vary == "site":
+            parts.append(get_current_site(request).id)
+        elif vary == "language":
+            parts.append(translation.get_language())
+        elif vary == "authentication":
+            user = getattr(request, "user", None)
+            is_authenticated = getattr(user, "is_authenticated", False)
+            # Django < 1.10 has a method
+            if callable(is_authenticated):
+                is_authenticated = is_authenticated()
+            parts.append("auth" if is_authenticated else "anon")
+    return make_key(*parts)
+
+
+def varies_by_request(tile):
+    """Return whether the tile's HTML differs by language or authentication.
+    A slot cached per site can not hold such tiles.
+    """
+
+    varies = set(vary.strip() for vary in (tile.cache_vary or "").split(","))
+    return bool(varies & set(["language", "authentication"]))
+
+
+def get_slot_cache_key(slot, request):
+    """Return the key the rendered slot is cached under for this request."""
+
+    return make_key("slot", slot.id, get_current_site(request).id)
+
+
+def get_slot_version(slot):
+    """The rows, columns and tiles of a slot are versioned by its tree
+    version, the targets of its tiles by its own version.
+    """
+
+    return ":".join(get_versions([("tree", slot.id), ("slot", slot.id)]))
+
+
+def invalidate_tile(tile_id):
+    bump_version("tile", tile_id)
+
+
+def invalidate_slot(slot_id):
+    bump_version("slot", slot_id)
@@ -0,0 +1,24 @@
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning
+
+from composer.caching import get_cache
+from composer.utils import get_setting
+
+
+def check_cache(app_configs, **kwargs):
+    """Slot indexes kept in memory and cached trees, slots and tiles are only
+    invalidated in other processes through the cache.
+    """
+
+    if isinstance(get_cache(), (LocMemCache, DummyCache)):
+        return [Warning(
+            "The composer cache \"%s\" is not shared between processes."
+            % get_setting("cache", "default"),
+            hint="Changes to slots only reach other processes once their "
+                 "slot index expires, and cached trees and tiles go stale. "
+                 "Set COMPOSER[\"cache\"] to a cache that all processes "
+                 "share, unless the site runs in a single process.",
+            id="composer.W001",
+        )]
+    return []
@@ -1,24 +1,73 @@
-import re
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 
-from composer.models import Slot
+from django.contrib.sites.shortcuts import get_current_site
 
+from composer.index import resolve_slots
+from composer.utils import get_setting
 
-def slots(request):
-    """Get the available slots for this URL and return as a mapping."""
 
-    # todo: cache
+class LazySlots(Mapping):
+    """Mapping of slot name to slot for a request. Slot names are only
+    resolved once a template asks for them, so pages that never use the
+    composer tag do not pay for slot resolution.
+    """
+
+    def __init__(self, request):
+        self.request = request
+        self._slots = {}
+        self._resolved = set()
+        self._complete = False
+
+    def _resolve(self, names=None):
+        request = self.request
+
+        # Matching on path_info means query strings do not affect the result
+        if get_setting("match-path-info", False):
+            path = request.path_info
+        else:
+            path = request.get_full_path()
+
+        self._slots.update(
+            resolve_slots(get_current_site(request).id, path, names)
+        )
+        if names is None:
+            self._complete = True
+        else:
+            self._resolved.update(names)
+
+    def declare(self, names):
+        """Resolve all the given slot names at once, eg. the slot names of
+        the template being rendered.
+        """
 
-    # Sort by slot url length reversed because we want the best regex match
-    slots = list(Slot.permitted.all())
-    slots = sorted(slots, key=lambda item: len(item.url), reverse=True)
+        if not self._complete:
+            names = [name for name in names if name not in self._resolved]
+            if names:
+                self._resolve(names)
 
-    # Assemble map with best matches
-    slot_map = {}
-    request_path = request.get_full_path()
-    for slot in slots:
-        if slot.slot_name in slot_map:
-            continue
-        if re.search(r"%s" % slot.url, request_path):
-            slot_map[slot.slot_name] = slot
+    def __getitem__(self, name):
+        if not self._complete and (name not in self._resolved):
+            self._resolve([name])
+        return self._slots[name]
+
+    def __iter__(self):
+        if not self._complete:
+            self._resolve()
+        return iter(self._slots)
+
+    def __len__(self):
+        if not self._complete:
+            self._resolve()
+        return len(self._slots)
+
+
+def slots(request):
+    """Get the available slots for this URL and return as a lazy mapping."""
 
-    return {"composer_slots": slot_map}
+    # The mapping is shared by all templates rendered for the request
+    if not hasattr(request, "_composer_slots"):
+        request._composer_slots = LazySlots(request)
+    return {"composer_slots": request._composer_slots}
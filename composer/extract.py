@@ -0,0 +1,77 @@
+"""Extract the contents of a single element from an HTML document without
+building a DOM.
+"""
+try:
+    from html.parser import HTMLParser
+except ImportError:
+    from HTMLParser import HTMLParser
+
+
+# Amount of characters fed to the parser at a time. Parsing stops as soon as
+# the element is complete, so the rest of the document is never looked at.
+CHUNK_SIZE = 8192
+
+
+class _Done(Exception):
+    pass
+
+
+class ContentExtractor(HTMLParser):
+    """Find the start and end offsets of the contents of the div with the
+    given id. Only div tags are counted to find the matching end tag.
+    """
+
+    def __init__(self, html, element_id):
+        HTMLParser.__init__(self)
+        self.html = html
+        self.element_id = element_id
+        self.depth = 0
+        self.start = None
+        self.end = None
+        # Offsets of the first character of each line seen so far
+        self._line_offsets = [0]
+
+    def get_offset(self):
+        """Return the offset in the document of the tag being handled."""
+
+        lineno, column = self.getpos()
+        line_offsets = self._line_offsets
+        while len(line_offsets) < lineno:
+            line_offsets.append(self.html.index("\n", line_offsets[-1]) + 1)
+        return line_offsets[lineno - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "div":
+            return
+        if self.start is not None:
+            self.depth += 1
+        elif dict(attrs).get("id") == self.element_id:
+            self.start = self.get_offset() + len(self.get_starttag_text())
+            self.depth = 1
+
+    def handle_endtag(self, tag):
+        if (tag != "div") or (self.start is None):
+            return
+        self.depth -= 1
+        if self.depth == 0:
+            self.end = self.get_offset()
+            raise _Done()
+
+
+def extract_content(html, element_id="content"):
+    """Return the contents of the div with the given id as a slice of html,
+    or None if there is no such div or it is never closed.
+    """
+
+    # Cheap check that avoids parsing most documents without the div
+    if element_id not in html:
+        return None
+
+    parser = ContentExtractor(html, element_id)
+    try:
+        for i in range(0, len(html), CHUNK_SIZE):
+            parser.feed(html[i:i + CHUNK_SIZE])
+        parser.close()
+    except _Done:
+        return html[parser.start:parser.end]
+    return None
@@ -0,0 +1,80 @@
+"""Render a single block of a template response instead of the whole page.
+
+Views rendered in tiles typically extend base.html, but only their content
+is shown. Rendering just the content block avoids rendering the rest of the
+page and having to extract the content from the HTML afterwards.
+"""
+from django.template.base import Template, TextNode
+from django.template.context import make_context
+from django.template.loader_tags import (
+    BLOCK_CONTEXT_KEY, BlockContext, BlockNode, ExtendsNode
+)
+
+
+def _get_extends_node(template):
+    # The extends tag has to be the first non-text node
+    for node in template.nodelist:
+        if not isinstance(node, TextNode):
+            if isinstance(node, ExtendsNode):
+                return node
+            return None
+    return None
+
+
+def _push_state(context, template):
+    render_context = context.render_context
+    if hasattr(render_context, "push_state"):
+        return render_context.push_state(template)
+    # Django < 1.11
+    return render_context.push()
+
+
+def render_block(template, context, block_name):
+    """Render the named block of a compiled template that extends another
+    template. Returns None if the template does not extend anything or the
+    block does not exist.
+    """
+
+    extends_node = _get_extends_node(template)
+    if extends_node is None:
+        return None
+
+    with _push_state(context, template):
+        with context.bind_template(template):
+            context.template_name = template.name
+
+            # Collect the blocks over the inheritance chain the same way the
+            # extends tag does.
+            block_context = BlockContext()
+            context.render_context[BLOCK_CONTEXT_KEY] = block_context
+            while extends_node is not None:
+                block_context.add_blocks(extends_node.blocks)
+                parent = extends_node.get_parent(context)
+                extends_node = _get_extends_node(parent)
+                if extends_node is None:
+                    block_context.add_blocks(dict(
+                        (node.name, node) for node in
+                        parent.nodelist.get_nodes_by_type(BlockNode)
+                    ))
+
+            block = block_context.get_block(block_name)
+            if block is None:
+                return None
+            return block.render(context)
+
+
+def render_fragment(response, block_name):
+    """Render only the named block of an unrendered template response.
+    Returns None if that is not possible, eg. because the template does not
+    use the Django template language.
+    """
+
+    template = response.resolve_template(response.template_name)
+    template = getattr(template, "template", None)
+    if not isinstance(template, Template):
+        return None
+
+    context = make_context(
+        response.resolve_context(response.context_data), response._request
+    )
+    return render_block(template, context, block_name)
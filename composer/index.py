@@ -0,0 +1,172 @@
+import itertools
+import threading
+import time
+
+from composer.caching import bump_version, get_version
+from composer.matcher import SlotMatcher
+from composer.models import Slot
+from composer.utils import LRUCache, get_setting
+
+
+# Key is site id, value is a SlotIndex
+_indexes = {}
+_lock = threading.Lock()
+
+# Key is a tuple (site id, path), value is a tuple (index generation, mapping of
+# slot name to slot id). Created on first use so settings can be read.
+_slot_maps = None
+
+# Every index built gets a new generation
+_generations = itertools.count()
+
+
+class SlotIndex(object):
+    """The slots of a single site with their URL patterns compiled and sorted
+    so that the best match for a slot name is always found first. Slots are
+    fetched per slot name when they are first needed.
+    """
+
+    def __init__(self, site_id, version):
+        self.site_id = site_id
+        self.version = version
+        self.slots = {}
+        # Key is slot name, value is a SlotMatcher
+        self.matchers = {}
+        # Key is slot name, value is a set of slot URL patterns
+        self.urls = {}
+        # All slot names for the site have been loaded
+        self.complete = False
+        self.generation = next(_generations)
+        # Changes only reach processes that do not share the cache once the
+        # index expires.
+        timeout = get_setting("slot-index-timeout", 60)
+        self.expires = None if timeout is None else (time.time() + timeout)
+        self._lock = threading.Lock()
+
+    def is_current(self, version):
+        return (self.version == version) and (
+            (self.expires is None) or (time.time() < self.expires)
+        )
+
+    def load(self, names=None):
+        """Fetch the slots with the given names, or all slots if names is
+        None, unless they have been fetched already.
+        """
+
+        if self.complete:
+            return
+        with self._lock:
+            queryset = Slot.objects.filter(sites__id__exact=self.site_id)
+            if names is None:
+                queryset = queryset.exclude(slot_name__in=list(self.matchers))
+            else:
+                names = [name for name in names if name not in self.matchers]
+                if not names:
+                    return
+                queryset = queryset.filter(slot_name__in=names)
+
+            by_name = dict((name, []) for name in (names or []))
+            for slot in queryset:
+                by_name.setdefault(slot.slot_name, []).append(slot)
+
+            for name, slots in by_name.items():
+                # Sort by slot url length reversed because we want the best
+                # regex match.
+                slots = sorted(slots, key=lambda item: len(item.url), reverse=True)
+                self.slots.update((slot.id, slot) for slot in slots)
+                self.matchers[name] = SlotMatcher(slots)
+                self.urls[name] = frozenset(slot.url for slot in slots)
+
+            if names is None:
+                self.complete = True
+
+    def get_urls(self, name):
+        """Return the set of URL patterns of the slots with the given name."""
+
+        self.load([name])
+        return self.urls[name]
+
+    def match(self, path, names=None):
+        """Return a mapping of slot name to the best matching slot. If names
+        is given only slots with those names are fetched and considered.
+        """
+
+        self.load(names)
+        if names is None:
+            names = list(self.matchers)
+        slot_map = {}
+        for name in names:
+            slot_map.update(self.matchers[name].match(path))
+        return slot_map
+
+
+def get_slot_index(site_id):
+    """Return the index for the site, rebuilding it if any slot changed in
+    this or any other process since it was built, or if it expired.
+    """
+
+    version = get_version("slots")
+    index = _indexes.get(site_id)
+    if (index is None) or not index.is_current(version):
+        with _lock:
+            index = _indexes.get(site_id)
+            if (index is None) or not index.is_current(version):
+                index = SlotIndex(site_id, version)
+                _indexes[site_id] = index
+    return index
+
+
+def get_slot_map_cache():
+    global _slot_maps
+    if _slot_maps is None:
+        _slot_maps = LRUCache(get_setting("slot-map-cache-size", 1000))
+    return _slot_maps
+
+
+def resolve_slots(site_id, path, names=None):
+    """Return a mapping of slot name to the best matching slot for the path.
+    If names is given only those slot names are resolved. Recently resolved
+    paths are remembered until any slot changes.
+    """
+
+    index = get_slot_index(site_id)
+    cache = get_slot_map_cache()
+    key = (site_id, path)
+
+    # Value of resolved is a slot id, or None if no slot matches. Complete
+    # means all slot names have been resolved.
+    entry = cache.get(key)
+    if (entry is not None) and (entry[0] == index.generation):
+        generation, resolved, complete = entry
+    else:
+        generation, resolved, complete = index.generation, {}, False
+
+    if complete:
+        missing = []
+    elif names is None:
+        missing = None
+    else:
+        missing = [name for name in names if name not in resolved]
+
+    if missing != []:
+        slot_map = index.match(path, missing)
+        resolved = dict(resolved)
+        for name in (missing or []):
+            resolved[name] = None
+        for name, slot in slot_map.items():
+            resolved[name] = slot.id
+        complete = complete or (missing is None)
+        cache.set(key, (generation, resolved, complete))
+
+    if names is None:
+        names = resolved.keys()
+    return dict(
+        (name, index.slots[resolved[name]]) for name in names
+        if resolved.get(name) is not None
+    )
+
+
+def invalidate_slot_indexes():
+    _indexes.clear()
+    get_slot_map_cache().clear()
+    bump_version("slots")
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from composer.models import Tile
+
+
+class Command(BaseCommand):
+    help = "Store rendered markdown for tiles where it is missing or stale."
+
+    def handle(self, *args, **options):
+        count = 0
+        tiles = Tile.objects.exclude(markdown=None).exclude(markdown="")
+        for tile in tiles.iterator():
+            if tile.update_rendered_markdown():
+                tile.save(
+                    update_fields=["rendered_markdown", "markdown_version"]
+                )
+                count += 1
+        self.stdout.write("Rendered markdown for %s tiles." % count)
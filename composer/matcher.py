@@ -0,0 +1,170 @@
+"""Match a path against many slot URL patterns at once.
+
+Most slot URLs are plain paths anchored at the start, eg. ^/about-us/ or ^/$.
+The literal part of such patterns is stored in a trie so a single walk over
+the path yields the candidate slots. Only patterns that are truly dynamic are
+evaluated as regular expressions.
+"""
+import re
+
+
+# Characters that are special in a regular expression
+META = set(".^$*+?{}[]\\|()")
+
+# Characters that make the preceding atom optional or repeated
+QUANTIFIERS = set("*+?{")
+
+EXACT = "exact"
+PREFIX = "prefix"
+ANCHORED = "anchored"
+CONTAINS = "contains"
+DYNAMIC = "dynamic"
+
+
+def split_literal(pattern):
+    """Return the longest literal prefix of pattern and the remainder."""
+
+    literal = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        step = 1
+        if char == "\\":
+            # An escaped non-alphanumeric character is a literal. Anything
+            # else, eg. \d, is a character class or assertion.
+            if (i + 1 < len(pattern)) and not pattern[i + 1].isalnum():
+                char = pattern[i + 1]
+                step = 2
+            else:
+                break
+        elif char in META:
+            break
+
+        # A quantified character is not guaranteed to be present
+        if pattern[i + step:i + step + 1] in QUANTIFIERS:
+            break
+
+        literal.append(char)
+        i += step
+
+    return "".join(literal), pattern[i:]
+
+
+def has_top_level_alternation(pattern):
+    """Alternation outside of any group defeats the start anchor."""
+
+    depth = 0
+    in_class = False
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if in_class:
+            if char == "]":
+                in_class = False
+        elif char == "[":
+            in_class = True
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        elif (char == "|") and (depth == 0):
+            return True
+        i += 1
+    return False
+
+
+def analyse(pattern):
+    """Return a tuple (kind, literal) describing how pattern can be matched
+    without evaluating it as a regular expression.
+    """
+
+    # Inline flags, eg. (?i), may change the meaning of the literal part
+    if has_top_level_alternation(pattern) \
+            or re.search(r"\(\?[aiLmsux]", pattern):
+        return DYNAMIC, ""
+
+    if pattern.startswith("^"):
+        literal, rest = split_literal(pattern[1:])
+        if rest == "$":
+            return EXACT, literal
+        if rest == "":
+            return PREFIX, literal
+        return ANCHORED, literal
+
+    literal, rest = split_literal(pattern)
+    if literal and (rest == ""):
+        return CONTAINS, literal
+    return DYNAMIC, ""
+
+
+class TrieNode(object):
+    __slots__ = ("children", "entries")
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+
+
+class SlotMatcher(object):
+    """Find the best matching slot per slot name for a path.
+
+    The slots must be passed in order of preference. The first slot with a
+    given slot name that matches a path wins.
+    """
+
+    def __init__(self, slots):
+        self.root = TrieNode()
+        self.exact = {}
+        self.contains = []
+        self.dynamic = []
+
+        for order, slot in enumerate(slots):
+            kind, literal = analyse(slot.url)
+            if kind in (ANCHORED, DYNAMIC):
+                entry = (order, slot, re.compile(r"%s" % slot.url))
+            else:
+                entry = (order, slot, None)
+
+            if kind == EXACT:
+                self.exact.setdefault(literal, []).append(entry)
+            elif kind in (PREFIX, ANCHORED):
+                node = self.root
+                for char in literal:
+                    node = node.children.setdefault(char, TrieNode())
+                node.entries.append(entry)
+            elif kind == CONTAINS:
+                self.contains.append((literal, entry))
+            else:
+                self.dynamic.append(entry)
+
+    def candidates(self, path):
+        """Return entries for all slots that may match the path."""
+
+        result = list(self.exact.get(path, []))
+        node = self.root
+        result.extend(node.entries)
+        for char in path:
+            node = node.children.get(char)
+            if node is None:
+                break
+            result.extend(node.entries)
+        for literal, entry in self.contains:
+            if literal in path:
+                result.append(entry)
+        result.extend(self.dynamic)
+        return result
+
+    def match(self, path):
+        """Return a mapping of slot name to the best matching slot."""
+
+        slot_map = {}
+        candidates = sorted(self.candidates(path), key=lambda item: item[0])
+        for order, slot, regex in candidates:
+            if slot.slot_name in slot_map:
+                continue
+            if (regex is None) or regex.search(path):
+                slot_map[slot.slot_name] = slot
+        return slot_map
@@ -1,6 +1,6 @@
 from django.conf import settings
+from django.contrib.sites.shortcuts import get_current_site
 from django.http import Http404, HttpResponsePermanentRedirect
-from django.shortcuts import get_object_or_404
 from django.template.response import TemplateResponse
 try:
     from django.utils.deprecation import MiddlewareMixin
@@ -8,7 +8,9 @@ try:
 except ImportError:
     Mixin = object
 
+from composer.index import get_slot_index
 from composer.models import Slot
+from composer.utils import get_setting
 from composer.views import SlotView
 
 
@@ -20,37 +22,72 @@ class ComposerFallbackMiddleware(Mixin):
     """Combine composer slot and flatpage fallbacks.
     """
 
+    def add_surrogate_control(self, response):
+        """Tell the caching proxy to process Edge Side Includes in pages
+        that have them.
+        """
+
+        if get_setting("esi") and not response.streaming \
+                and (b"<esi:include" in response.content):
+            response["Surrogate-Control"] = 'content="ESI/1.0"'
+        return response
+
     def process_response(self, request, response):
         # Composer pages and flatpages only render on 404
         if response.status_code != 404:
-            return response
+            return self.add_surrogate_control(response)
 
-        try:
-            response = SlotView.as_view()(request)
+        # Methods the slot view does not handle get a 405 from it whatever
+        # the path.
+        method = request.method.lower()
+        if (method != "head") and not hasattr(SlotView, method):
+            return SlotView.as_view()(request)
+
+        # Content slots are looked up by exact URL. Most paths that 404 can
+        # not match any, so they are ruled out without a query.
+        if self.has_content_slot(request):
+            return self.process_slot(request, response)
+        return self.process_flatpage(request, response)
+
+    def has_content_slot(self, request):
+        """Return True if a content slot may exist for the path or the path
+        with a slash appended.
+        """
+
+        urls = get_slot_index(get_current_site(request).id).get_urls("content")
+        url = request.path_info
+        if url in urls:
+            return True
+        return not url.endswith("/") and settings.APPEND_SLASH \
+            and ((url + "/") in urls)
+
+    def process_slot(self, request, response):
+        # Fetch the slot for the path and the path with a slash appended in
+        # one go.
+        url = request.path_info
+        urls = [url]
+        if not url.endswith("/") and settings.APPEND_SLASH:
+            urls.append(url + "/")
+        slots = dict(
+            (slot.url, slot) for slot in Slot.permitted.filter(
+                url__in=urls, slot_name="content"
+            )
+        )
+
+        if url in slots:
+            response = SlotView.as_view(slot=slots[url])(request)
             if isinstance(response, TemplateResponse):
-                return response.render()
-            else:
-                return response
-        except Http404:
-            # Try the url with a slash appended.
-            url = request.path_info
-            if not url.endswith("/") and settings.APPEND_SLASH:
-                url += "/"
-                try:
-                    f = get_object_or_404(
-                        Slot.permitted,
-                        url=url,
-                        slot_name="content"
-                    )
-                    return HttpResponsePermanentRedirect("%s/" % request.path)
-                except Http404:
-                    # No slot with slash appended. Fall through.
-                    pass
-            else:
-                # Settings say do not append a slash.
-                pass
-
-        # Both "pass" conditions above means we did not find a suitable slot.
+                return self.add_surrogate_control(response.render())
+            return response
+
+        # Try the url with a slash appended
+        if (len(urls) > 1) and (urls[1] in slots):
+            return HttpResponsePermanentRedirect("%s/" % request.path)
+
+        # We did not find a suitable slot
+        return self.process_flatpage(request, response)
+
+    def process_flatpage(self, request, response):
         if "flatpages" not in settings.INSTALLED_APPS:
             return response
 
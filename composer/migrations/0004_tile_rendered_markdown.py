@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0003_auto_20171124_1049'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tile',
+            name='rendered_markdown',
+            field=models.TextField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='tile',
+            name='markdown_version',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the markdown and markdown settings that were used to render rendered_markdown.', max_length=40, null=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0004_tile_rendered_markdown'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tile',
+            name='cache_timeout',
+            field=models.PositiveIntegerField(blank=True, help_text='Number of seconds the rendered tile is cached for. Leave empty to not cache the tile.', null=True),
+        ),
+        migrations.AddField(
+            model_name='tile',
+            name='cache_vary',
+            field=models.CharField(blank=True, help_text='Comma separated list of what the cached tile differs by. Any of site, language and authentication.', max_length=200, null=True),
+        ),
+    ]
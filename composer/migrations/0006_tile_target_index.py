@@ -0,0 +1,18 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0005_tile_cache'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='tile',
+            index_together=set([('target_content_type', 'target_object_id')]),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0006_tile_target_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='slot',
+            name='cache_timeout',
+            field=models.PositiveIntegerField(blank=True, help_text='Number of seconds the rendered slot is cached for, per site. Leave empty to not cache the slot. Slots with uncacheable tiles are never cached.', null=True),
+        ),
+        migrations.AddField(
+            model_name='tile',
+            name='uncacheable',
+            field=models.BooleanField(default=False, help_text='Check if the tile differs per user or request, eg. a login form. The slot the tile is in is then never cached as a whole.'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0007_slot_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tile',
+            name='deferred',
+            field=models.BooleanField(default=False, help_text='Check to load the tile in the browser after the page is shown. Use for slow tiles that are not immediately visible.'),
+        ),
+    ]
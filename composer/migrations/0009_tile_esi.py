@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('composer', '0008_tile_deferred'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tile',
+            name='esi',
+            field=models.BooleanField(default=False, help_text='Check if the tile may be cached independently of the page. If Edge Side Includes are enabled the tile is then included by the caching proxy.', verbose_name='ESI'),
+        ),
+    ]
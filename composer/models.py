@@ -1,3 +1,6 @@
+import hashlib
+import json
+
 import markdown
 
 from django.conf import settings
@@ -16,35 +19,113 @@ except ImportError:
 from simplemde.fields import SimpleMDEField
 
 from composer.managers import PermittedManager
+from composer.utils import get_setting
 
 
 # TODO: Make sure slot is unique per url and site
 
-class AttributeWrapper:
-    """Wrapper that allows attributes to be added or overridden on an object.
-    Copied from jmbo-foundry.
+CACHE_VARY_CHOICES = (
+    ("site", "Site"),
+    ("language", "Language"),
+    ("authentication", "Authenticated or anonymous"),
+)
+
+def render_markdown(text):
+    if not text:
+        return ""
+    return mark_safe(markdown.markdown(
+        text,
+        extensions=get_setting("markdown-extensions", []),
+        extension_configs=get_setting("markdown-extension-configs", {})
+    ))
+
+
+def get_markdown_version(text):
+    """Return a hash of the markdown source and the markdown configuration
+    that identifies the resulting HTML.
+    """
+
+    config = json.dumps([
+        get_setting("markdown-extensions", []),
+        get_setting("markdown-extension-configs", {})
+    ], sort_keys=True)
+    return hashlib.sha1((config + text).encode("utf-8")).hexdigest()
+
+
+def get_markdown_content(text, html, version):
+    """Return the stored HTML if it was rendered from the markdown source with
+    the current configuration, else render the markdown.
     """
 
-    def __init__(self, obj, **kwargs):
-        self._obj = obj
-        self._attributes = {}
-        for k, v in kwargs.items():
-            self._attributes[k] = v
+    if not text:
+        return ""
+    if (html is not None) and (version == get_markdown_version(text)):
+        return mark_safe(html)
+    return render_markdown(text)
+
+
+class RowData(object):
+    """Light weight row as used by templates. Rows, columns and tiles are
+    built for every slot on every page, so only the fields that templates use
+    are copied and __slots__ keeps them small and cheap to pickle.
+    """
+
+    __slots__ = ("id", "position", "class_name", "columns")
+    fields = ("id", "position", "class_name")
+
+    def __init__(self, values, columns):
+        self.id, self.position, self.class_name = values
+        self.columns = columns
+
 
-    def __getattr__(self, key):
-        if key in self._attributes:
-            return self._attributes[key]
-        return getattr(self._obj, key)
+class ColumnData(object):
+    """Light weight column as used by templates."""
 
-    def __setstate__(self, dict):
-        self.__dict__.update(dict)
+    __slots__ = ("id", "position", "width", "title", "class_name", "tiles")
+    fields = ("id", "position", "width", "title", "class_name")
+
+    def __init__(self, values, tiles):
+        self.id, self.position, self.width, self.title, self.class_name = \
+            values
+        self.tiles = tiles
+
+
+class TileData(object):
+    """Light weight tile as used by templates and passed to tile views."""
+
+    __slots__ = (
+        "id", "position", "view_name", "target_content_type_id",
+        "target_object_id", "markdown", "rendered_markdown",
+        "markdown_version", "style", "class_name", "cache_timeout",
+        "cache_vary", "uncacheable", "deferred", "esi", "target", "_content"
+    )
+    fields = (
+        "id", "position", "view_name", "target_content_type_id",
+        "target_object_id", "markdown", "rendered_markdown",
+        "markdown_version", "style", "class_name", "cache_timeout",
+        "cache_vary", "uncacheable", "deferred", "esi"
+    )
+
+    def __init__(self, values, target=None):
+        self.id, self.position, self.view_name, self.target_content_type_id, \
+            self.target_object_id, self.markdown, self.rendered_markdown, \
+            self.markdown_version, self.style, self.class_name, \
+            self.cache_timeout, self.cache_vary, self.uncacheable, \
+            self.deferred, self.esi = values
+        self.target = target
+        self._content = None
 
     @property
-    def klass(self):
-        """Can't override __class__ and making it a property also does not
-        work. Could be because of Django metaclasses.
-        """
-        return self._obj.__class__
+    def content(self):
+        if self._content is None:
+            self._content = get_markdown_content(
+                self.markdown, self.rendered_markdown, self.markdown_version
+            )
+        return self._content
+
+
+def get_values(obj, fields):
+    return tuple(getattr(obj, field) for field in fields)
 
 
 class Slot(models.Model):
@@ -77,6 +158,13 @@ limited to one or two sentences."),
         help_text="Sites that this slot will appear on.",
         blank=True,
     )
+    cache_timeout = models.PositiveIntegerField(
+        help_text="Number of seconds the rendered slot is cached for, per \
+site. Leave empty to not cache the slot. Slots with uncacheable tiles are \
+never cached.",
+        null=True,
+        blank=True,
+    )
 
     objects = models.Manager()
     permitted = PermittedManager()
@@ -94,79 +182,7 @@ limited to one or two sentences."),
     def rows(self):
         """Fetch rows, columns and tiles in a single query
         """
-
-        # Organize into a structure
-        tiles = []
-        for tile in Tile.objects.select_related("column__row").filter(
-            column__row__slot=self
-        ).order_by("position"):
-            tiles.append(AttributeWrapper(tile, target=None))
-
-        # The most difficult part is to fetch the generic foreign keys in the
-        # least amount of queries.
-
-        # Key is content type id, value is target id
-        map_ct_targets = {}
-
-        # Key one is content type id, key two is target id, value is a list of
-        # tiles.
-        map_two_deep = {}
-
-        # Populate the dictionaries
-        for tile in tiles:
-            ct_id = tile.target_content_type_id
-            if not ct_id:
-                continue
-            target_id = tile.target_object_id
-
-            # map_ct_targets
-            if ct_id not in map_ct_targets:
-                map_ct_targets[ct_id] = []
-            map_ct_targets[ct_id].append(target_id)
-
-            # map_two_deep
-            if ct_id not in map_two_deep:
-                map_two_deep[ct_id] = {}
-            if target_id not in map_two_deep[ct_id]:
-                map_two_deep[ct_id][target_id] = []
-            map_two_deep[ct_id][target_id].append(tile)
-
-        # Pre-lookup the content types
-        content_types = {}
-        for ct in ContentType.objects.filter(id__in=map_ct_targets.keys()):
-            content_types[ct.id] = ct
-
-        # Set the target objects on the tiles
-        for ct_id, ids in map_ct_targets.items():
-            for obj in content_types[ct_id].model_class().objects.filter(id__in=ids):
-                for tile in map_two_deep[ct_id][obj.id]:
-                    tile._attributes["target"] = obj
-
-        # Build the structure
-        struct = {}
-        for tile in tiles:
-            row = tile.column.row
-            if row not in struct:
-                struct.setdefault(row, {})
-            column = tile.column
-            if column not in struct[row]:
-                struct[row].setdefault(column, [])
-            struct[row][column].append(tile)
-
-        # Sort rows and columns in the structure
-        result = []
-        keys_row = struct.keys()
-        keys_row = sorted(keys_row, key=lambda item: item.position)
-        for row in keys_row:
-            keys_column = struct[row].keys()
-            keys_column = sorted(keys_column, key=lambda item: item.position)
-            column_objs = []
-            for column in keys_column:
-                column_objs.append(AttributeWrapper(
-                    column, tiles=struct[row][column]))
-            result.append(AttributeWrapper(row, columns=column_objs))
-
-        return result
+        return build_rows([self])[self.id]
 
 
 class Row(models.Model):
@@ -198,7 +214,9 @@ class Row(models.Model):
         keys_column = struct.keys()
         keys_column = sorted(keys_column, key=lambda item: item.position)
         for column in keys_column:
-            result.append(AttributeWrapper(column, tiles=struct[column]))
+            result.append(ColumnData(
+                get_values(column, ColumnData.fields), struct[column]
+            ))
 
         return result
 
@@ -267,6 +285,19 @@ it works. If this value is set it has precedence over target.""",
         "target_object_id",
     )
     markdown = SimpleMDEField(null=True, blank=True)
+    rendered_markdown = models.TextField(
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    markdown_version = models.CharField(
+        max_length=40,
+        help_text="Hash of the markdown and markdown settings that were used \
+to render rendered_markdown.",
+        null=True,
+        blank=True,
+        editable=False,
+    )
     style = models.CharField(
         max_length=200,
         default="tile",
@@ -281,6 +312,36 @@ inside the tile if target is set.""",
         null=True,
         blank=True,
     )
+    cache_timeout = models.PositiveIntegerField(
+        help_text="Number of seconds the rendered tile is cached for. Leave \
+empty to not cache the tile.",
+        null=True,
+        blank=True,
+    )
+    cache_vary = models.CharField(
+        max_length=200,
+        help_text="""Comma separated list of what the cached tile differs \
+by. Any of site, language and authentication.""",
+        null=True,
+        blank=True,
+    )
+    uncacheable = models.BooleanField(
+        default=False,
+        help_text="Check if the tile differs per user or request, eg. a \
+login form. The slot the tile is in is then never cached as a whole.",
+    )
+    deferred = models.BooleanField(
+        default=False,
+        help_text="Check to load the tile in the browser after the page is \
+shown. Use for slow tiles that are not immediately visible.",
+    )
+    esi = models.BooleanField(
+        "ESI",
+        default=False,
+        help_text="Check if the tile may be cached independently of the \
+page. If Edge Side Includes are enabled the tile is then included by the \
+caching proxy.",
+    )
 
     @property
     def label(self):
@@ -293,9 +354,140 @@ inside the tile if target is set.""",
 
     @cached_property
     def content(self):
-        if not self.markdown:
-            return ""
-        return mark_safe(markdown.markdown(self.markdown))
+        return get_markdown_content(
+            self.markdown, self.rendered_markdown, self.markdown_version
+        )
+
+    def update_rendered_markdown(self):
+        """Render the markdown if it or the markdown settings changed. Returns
+        True if anything changed.
+        """
+
+        version = get_markdown_version(self.markdown) if self.markdown else None
+        if version == self.markdown_version:
+            return False
+        self.rendered_markdown = render_markdown(self.markdown) or None
+        self.markdown_version = version
+        return True
+
+    def save(self, *args, **kwargs):
+        self.update_rendered_markdown()
+        super(Tile, self).save(*args, **kwargs)
 
     class Meta:
         ordering = ['position']
+        index_together = [("target_content_type", "target_object_id")]
+
+
+def fetch_tiles(slots):
+    """Fetch the tiles of many slots along with their columns and rows in a
+    single query.
+    """
+    return list(Tile.objects.select_related("column__row").filter(
+        column__row__slot__in=[slot.id for slot in slots]
+    ).order_by("position"))
+
+
+def build_rows(slots):
+    """Fetch rows, columns and tiles for many slots in a single query and
+    return a dictionary of slot id to rows.
+    """
+    return assemble_rows(dump_rows(slots, fetch_tiles(slots)))
+
+
+def dump_rows(slots, tiles):
+    """Organize tiles with their columns and rows set into a dictionary of
+    slot id to rows. Rows, columns and tiles are represented as sorted nested
+    tuples of field values, which is a compact form suitable for caching.
+    """
+
+    # Build the structure. Key one is slot id, key two is row, key three is
+    # column, value is a list of tiles.
+    struct = dict((slot.id, {}) for slot in slots)
+    for tile in tiles:
+        row = tile.column.row
+        slot_struct = struct[row.slot_id]
+        if row not in slot_struct:
+            slot_struct.setdefault(row, {})
+        column = tile.column
+        if column not in slot_struct[row]:
+            slot_struct[row].setdefault(column, [])
+        slot_struct[row][column].append(get_values(tile, TileData.fields))
+
+    # Sort rows and columns in the structure
+    result = {}
+    for slot_id, slot_struct in struct.items():
+        rows = []
+        keys_row = slot_struct.keys()
+        keys_row = sorted(keys_row, key=lambda item: item.position)
+        for row in keys_row:
+            keys_column = slot_struct[row].keys()
+            keys_column = sorted(keys_column, key=lambda item: item.position)
+            columns = []
+            for column in keys_column:
+                columns.append((
+                    get_values(column, ColumnData.fields),
+                    slot_struct[row][column]
+                ))
+            rows.append((get_values(row, RowData.fields), columns))
+        result[slot_id] = rows
+
+    return result
+
+
+def assemble_rows(dumped):
+    """Turn the output of dump_rows into a dictionary of slot id to rows as
+    used by templates, fetching the tile targets along the way.
+    """
+
+    result = {}
+    tiles = []
+    for slot_id, rows in dumped.items():
+        row_objs = []
+        for row_values, columns in rows:
+            column_objs = []
+            for column_values, tile_values in columns:
+                column_tiles = [TileData(values) for values in tile_values]
+                tiles.extend(column_tiles)
+                column_objs.append(ColumnData(column_values, column_tiles))
+            row_objs.append(RowData(row_values, column_objs))
+        result[slot_id] = row_objs
+
+    # The most difficult part is to fetch the generic foreign keys in the
+    # least amount of queries.
+
+    # Key is content type id, value is target id
+    map_ct_targets = {}
+
+    # Key one is content type id, key two is target id, value is a list of
+    # tiles.
+    map_two_deep = {}
+
+    # Populate the dictionaries
+    for tile in tiles:
+        ct_id = tile.target_content_type_id
+        if not ct_id:
+            continue
+        target_id = tile.target_object_id
+
+        # map_ct_targets
+        if ct_id not in map_ct_targets:
+            map_ct_targets[ct_id] = []
+        map_ct_targets[ct_id].append(target_id)
+
+        # map_two_deep
+        if ct_id not in map_two_deep:
+            map_two_deep[ct_id] = {}
+        if target_id not in map_two_deep[ct_id]:
+            map_two_deep[ct_id][target_id] = []
+        map_two_deep[ct_id][target_id].append(tile)
+
+    # Set the target objects on the tiles. Content types are cached by
+    # Django so looking them up is usually free.
+    for ct_id, ids in map_ct_targets.items():
+        model_class = ContentType.objects.get_for_id(ct_id).model_class()
+        for obj in model_class.objects.filter(id__in=ids):
+            for tile in map_two_deep[ct_id][obj.id]:
+                tile.target = obj
+
+    return result
@@ -0,0 +1,184 @@
+"""Render the view tiles of a slot concurrently.
+
+Every view tile calls a view that may do its own database and cache I/O. When
+the ``parallel-tiles`` setting is set the view tiles of a slot are rendered on
+a bounded thread pool before the slot itself is rendered, so the slot takes
+roughly as long as its slowest tile instead of the sum of all of them.
+"""
+import copy
+import threading
+import time
+try:
+    from concurrent import futures
+except ImportError:
+    # Python 2 needs the futures backport
+    futures = None
+
+from crum import get_current_request, set_current_request
+from django.db import connections
+from django.template.context import make_context
+from django.template.loader import get_template, render_to_string
+
+from composer.utils import get_setting
+
+
+_executor = None
+_max_workers = None
+_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the shared thread pool, or None if tiles are rendered in
+    sequence.
+    """
+
+    global _executor, _max_workers
+    max_workers = get_setting("parallel-tiles")
+    if (futures is None) or not max_workers:
+        return None
+    if max_workers != _max_workers:
+        with _lock:
+            # The pool is replaced when the setting changes, eg. in tests
+            if max_workers != _max_workers:
+                if _executor is not None:
+                    _executor.shutdown(wait=False)
+                _executor = futures.ThreadPoolExecutor(max_workers=max_workers)
+                _max_workers = max_workers
+    return _executor
+
+
+def call_with_request(request, func, *args):
+    """Call func in a worker thread with request as the current request."""
+
+    previous = get_current_request()
+    set_current_request(request)
+    try:
+        return func(*args)
+    finally:
+        set_current_request(previous)
+        # Connections are per thread and would otherwise stay open
+        connections.close_all()
+
+
+def copy_context(context):
+    """Return a copy of context with a copy of its request. Rendering a view
+    tile sets flags on the request, so concurrent tiles may not share one.
+    """
+
+    request = copy.copy(context["request"])
+    context = copy.copy(context)
+    context.render_context = copy.copy(context.render_context)
+    context.push(request=request)
+    return context
+
+
+def iter_loop(items, parentloop):
+    """Yield each item with the forloop variable the for tag sets for it."""
+
+    length = len(items)
+    for i, item in enumerate(items):
+        yield item, {
+            "parentloop": parentloop,
+            "counter0": i,
+            "counter": i + 1,
+            "revcounter": length - i,
+            "revcounter0": length - i - 1,
+            "first": i == 0,
+            "last": i == length - 1,
+        }
+
+
+def get_tile_contexts(request, rows):
+    """Return a list of tile and context pairs for the tiles in rows. Each
+    context is a copy of the one composer/inclusion_tags/composer.html
+    renders the tile in, so a tile looks the same whether it is rendered up
+    front or by the template.
+    """
+
+    template = get_template("composer/inclusion_tags/composer.html").template
+    context = make_context({"rows": rows}, request)
+    result = []
+    with context.bind_template(template):
+        for row, row_loop in iter_loop(rows, {}):
+            for column, column_loop in iter_loop(row.columns, row_loop):
+                for tile, forloop in iter_loop(column.tiles, column_loop):
+                    with context.push(
+                        row=row, column=column, tile=tile, forloop=forloop
+                    ):
+                        result.append((tile, copy_context(context)))
+    return result
+
+
+def render_in_thread(render, context, tile, started=None):
+    # A tile's timeout runs from when a worker picks it up
+    if started is not None:
+        started[tile.id] = time.time()
+    return call_with_request(context["request"], render, context, tile)
+
+
+def render_placeholder(tile):
+    return render_to_string(
+        "composer/tile_timeout.html", {"tile": tile}
+    )
+
+
+def get_view_tiles(request, rows):
+    """Return the view tiles in rows that have not been rendered yet, each
+    with its own context. Deferred tiles are rendered by the browser and ESI
+    tiles by the caching proxy.
+    """
+
+    prerendered = getattr(request, "_composer_prerendered", {})
+    esi = get_setting("esi")
+    return [
+        (tile, context) for tile, context in get_tile_contexts(request, rows)
+        if tile.view_name and not tile.deferred and not (esi and tile.esi)
+        and (tile.id not in prerendered)
+    ]
+
+
+def prerender_tiles(request, rows, render):
+    """Render the view tiles in rows by calling render on the thread pool.
+    Return a dictionary of tile id to HTML. A tile that is not rendered
+    within the ``tile-timeout`` setting after it started is replaced by a
+    placeholder, as is a tile that does not start within that time once the
+    tiles ahead of it are done. A tile that timed out keeps running in the
+    background until its view returns.
+    """
+
+    executor = get_executor()
+    if executor is None:
+        return {}
+    tiles = get_view_tiles(request, rows)
+    if len(tiles) < 2:
+        return {}
+
+    started = {}
+    submitted = [
+        (tile, executor.submit(
+            render_in_thread, render, context, tile, started
+        )) for tile, context in tiles
+    ]
+    timeout = get_setting("tile-timeout")
+
+    result = {}
+    for tile, future in submitted:
+        waiting_since = time.time()
+        while True:
+            start = started.get(tile.id)
+            remaining = None
+            if timeout is not None:
+                remaining = max(
+                    (waiting_since if start is None else start) + timeout
+                    - time.time(), 0
+                )
+            try:
+                result[tile.id] = future.result(remaining)
+            except futures.TimeoutError:
+                # Wait again if the tile started while it was queued
+                if (start is None) and (tile.id in started):
+                    continue
+                future.cancel()
+                result[tile.id] = render_placeholder(tile)
+            break
+    return result
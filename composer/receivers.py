@@ -0,0 +1,86 @@
+from django.apps import apps
+
+from composer.caching import invalidate_slot, invalidate_tile
+from composer.index import invalidate_slot_indexes
+from composer.models import Column, Row, Tile
+from composer.targets import get_target_tiles, invalidate_target_index
+from composer.trees import invalidate_tree
+from composer.utils import clear_template_caches, clear_url_caches
+
+
+def on_slot_changed(sender, instance, **kwargs):
+    invalidate_slot_indexes()
+    invalidate_tree(instance.id)
+
+
+def on_slot_sites_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_slot_indexes()
+
+
+# How rows, columns and tiles refer to their slot
+SLOT_LOOKUPS = {
+    Row: "slot_id",
+    Column: "row__slot_id",
+    Tile: "column__row__slot_id",
+}
+
+
+def on_tree_node_saving(sender, instance, raw=False, **kwargs):
+    # A row, column or tile may be moved to another slot, so remember the
+    # slot it is in before it is saved. Both slots are invalidated after.
+    if raw or (instance.pk is None):
+        return
+    instance._composer_old_slot_ids = set(sender.objects.filter(
+        pk=instance.pk
+    ).values_list(SLOT_LOOKUPS[sender], flat=True))
+
+
+def invalidate_trees(instance, slot_ids):
+    for slot_id in set(slot_ids) | getattr(
+        instance, "_composer_old_slot_ids", set()
+    ):
+        invalidate_tree(slot_id)
+
+
+def on_row_changed(sender, instance, **kwargs):
+    invalidate_trees(instance, [instance.slot_id])
+
+
+def on_column_changed(sender, instance, **kwargs):
+    # The row may already be gone if it is being deleted, in which case the
+    # row's own signal takes care of invalidation.
+    invalidate_trees(instance, Row.objects.filter(
+        id=instance.row_id
+    ).values_list("slot_id", flat=True))
+
+
+def on_tile_changed(sender, instance, **kwargs):
+    invalidate_tile(instance.id)
+    invalidate_target_index()
+    invalidate_trees(instance, Column.objects.filter(
+        id=instance.column_id
+    ).values_list("row__slot_id", flat=True))
+
+
+def on_model_changed(sender, instance, raw=False, **kwargs):
+    # Fixtures are loaded raw and historical models are saved by migrations,
+    # in either case the database may not be complete yet.
+    if raw or (sender._meta.apps is not apps) \
+            or (sender._meta.app_label == "composer"):
+        return
+    for tile_id, slot_id in get_target_tiles(sender, instance.pk):
+        invalidate_tile(tile_id)
+        invalidate_slot(slot_id)
+
+
+def on_setting_changed(sender, setting, **kwargs):
+    if setting == "ROOT_URLCONF":
+        clear_url_caches()
+    elif setting == "TEMPLATES":
+        clear_template_caches()
+
+
+def on_file_changed(sender, file_path, **kwargs):
+    # Python files restart the server, anything else may be a template
+    clear_template_caches()
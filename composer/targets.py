@@ -0,0 +1,95 @@
+"""Find the tiles that show a given object.
+
+Tiles point at arbitrary objects through a generic foreign key, so when an
+object is saved there is no relation to follow back to its tiles. This module
+keeps a map from content type and object id to tile ids in memory so that
+saving an object that is not the target of any tile costs nothing but a cache
+lookup, and saving one that is only evicts the cached HTML of its own tiles
+and slots.
+"""
+import threading
+
+from composer.caching import bump_version, get_version
+from composer.models import Tile
+
+
+# Created on first use and discarded when any tile changes
+_targets = None
+_lock = threading.Lock()
+
+
+class TargetIndex(object):
+    """The tiles with a target, per content type. The content types that are
+    targeted at all are fetched up front. The tiles of a content type are
+    fetched when an object of that type is first looked up.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        # Key is a tuple (app label, model name), value is content type id
+        self.content_types = dict(
+            ((app_label, model), ct_id) for ct_id, app_label, model in
+            Tile.objects.filter(target_content_type__isnull=False).values_list(
+                "target_content_type_id", "target_content_type__app_label",
+                "target_content_type__model"
+            ).distinct()
+        )
+        # Key is content type id, value is a mapping of object id to a list
+        # of tuples (tile id, slot id).
+        self.tiles = {}
+        self._lock = threading.Lock()
+
+    def get_tiles(self, model, object_id):
+        # Generic foreign keys store the content type of the concrete model
+        opts = model._meta.concrete_model._meta
+        ct_id = self.content_types.get((opts.app_label, opts.model_name))
+        if ct_id is None:
+            return []
+
+        by_object = self.tiles.get(ct_id)
+        if by_object is None:
+            with self._lock:
+                by_object = self.tiles.get(ct_id)
+                if by_object is None:
+                    by_object = {}
+                    for tile_id, target_id, slot_id in Tile.objects.filter(
+                        target_content_type_id=ct_id
+                    ).values_list(
+                        "id", "target_object_id", "column__row__slot_id"
+                    ):
+                        by_object.setdefault(target_id, []).append(
+                            (tile_id, slot_id)
+                        )
+                    self.tiles[ct_id] = by_object
+        return by_object.get(object_id, [])
+
+
+def get_target_index():
+    """Return the index, rebuilding it if any tile changed in this or any
+    other process since it was built.
+    """
+
+    global _targets
+    version = get_version("tile-targets")
+    index = _targets
+    if (index is None) or (index.version != version):
+        with _lock:
+            index = _targets
+            if (index is None) or (index.version != version):
+                index = TargetIndex(version)
+                _targets = index
+    return index
+
+
+def get_target_tiles(model, object_id):
+    """Return tuples (tile id, slot id) for the tiles that have the object as
+    target.
+    """
+
+    return get_target_index().get_tiles(model, object_id)
+
+
+def invalidate_target_index():
+    global _targets
+    _targets = None
+    bump_version("tile-targets")
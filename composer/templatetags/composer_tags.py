@@ -1,10 +1,7 @@
-from bs4 import BeautifulSoup
-
 from django import template
 from django.conf import settings
-from django.contrib.contenttypes.models import ContentType
-from django.db import models
 from django.http import HttpResponse
+from django.template.base import Template
 from django.template.loader import render_to_string
 from django.template.response import TemplateResponse
 from django.utils.text import mark_safe
@@ -13,7 +10,19 @@ try:
 except ImportError:
     from django.core.urlresolvers import NoReverseMatch, resolve, reverse
 
+from composer.caching import (
+    get_or_build, get_slot_cache_key, get_slot_version, get_tile_cache_key,
+    get_version, varies_by_request
+)
+from composer.extract import extract_content
+from composer.fragments import render_fragment
 from composer.models import Row
+from composer.parallel import prerender_tiles
+from composer.trees import get_rows
+from composer.utils import (
+    get_setting, get_style_template, get_target_template,
+    get_template_slot_names, resolve_view_name
+)
 
 
 register = template.Library()
@@ -35,6 +44,29 @@ class ComposerNode(template.Node):
     def __init__(self, slot_name):
         self.slot_name = slot_name
 
+    def get_rows(self, context, slot):
+        """Return the rows of a slot. The rows of all slots on the page are
+        fetched together when the first slot is rendered.
+        """
+
+        request = context["request"]
+        if not hasattr(request, "_composer_rows"):
+            request._composer_rows = {}
+        rows_map = request._composer_rows
+
+        if slot.id not in rows_map:
+            slots = {slot.id: slot}
+            if context.template is not None:
+                composer_slots = context["composer_slots"]
+                for name in get_template_slot_names(context.template):
+                    if name in composer_slots:
+                        other = composer_slots[name]
+                        if other.id not in rows_map:
+                            slots[other.id] = other
+            rows_map.update(get_rows(list(slots.values())))
+
+        return rows_map[slot.id]
+
     def render(self, context):
         request = context["request"]
 
@@ -46,13 +78,56 @@ class ComposerNode(template.Node):
         if "composer_slots" not in context:
             return ""
 
+        # Resolve the slots of all composer tags in the template in one go
+        composer_slots = context["composer_slots"]
+        if hasattr(composer_slots, "declare") and (context.template is not None):
+            composer_slots.declare(get_template_slot_names(context.template))
+
         # Return nothing if the slot does not exist
-        if self.slot_name not in context["composer_slots"]:
+        if self.slot_name not in composer_slots:
             return ""
 
-        slot = context["composer_slots"][self.slot_name]
-        rows = slot.rows
+        slot = composer_slots[self.slot_name]
+        if not slot.cache_timeout:
+            return self.render_slot(context, slot, self.get_rows(context, slot))
+
+        rendered = []
+
+        def build():
+            rows = self.get_rows(context, slot)
+            html = self.render_slot(context, slot, rows)
+            rendered.append(html)
+            cacheable = not any(
+                tile.uncacheable or varies_by_request(tile)
+                for row in rows for column in row.columns
+                for tile in column.tiles
+            )
+            return html if cacheable else False
+
+        # False means the slot has uncacheable tiles or tiles that vary by
+        # language or authentication
+        html = get_or_build(
+            get_slot_cache_key(slot, request), get_slot_version(slot), build,
+            slot.cache_timeout
+        )
+        if html is False:
+            if rendered:
+                return rendered[0]
+            return self.render_slot(context, slot, self.get_rows(context, slot))
+        return html
+
+    def render_slot(self, context, slot, rows):
+        request = context["request"]
         if rows:
+            # Render view tiles up front if they may be rendered in parallel
+            prerendered = prerender_tiles(
+                request, rows, TileNode("tile").render_cached
+            )
+            if prerendered:
+                if not hasattr(request, "_composer_prerendered"):
+                    request._composer_prerendered = {}
+                request._composer_prerendered.update(prerendered)
+
             # We have customized rows for the block. Use them.
             return render_to_string(
                 "composer/inclusion_tags/composer.html",
@@ -87,34 +162,53 @@ class TileNode(template.Node):
     def _render_url(self, context, tile, url):
         """Helper method that safely renders a view looked up from a URL."""
 
-        request = context["request"]
-
-        # Resolve view name to a function or object xxx: this is slow
-        # because there is no way to get the view function / object
-        # directly from the view name - you have to pass through the url.
-        # But since the result is consistent while the Django process is
-        # running it is a good candidate for caching.
         view, args, kwargs = resolve(url)
+        return self._render_view(context, tile, view, args, kwargs)
 
-        # Construct a final kwargs that includes the context
-        final_kwargs = context.flatten()
-        del final_kwargs["request"]
-        final_kwargs.update(kwargs)
+    def _get_view_kwargs(self, context, tile, kwargs):
+        """Views receive the tile and the context the tile is rendered in
+        along with the keyword arguments from the URL.
+        """
+
+        final_kwargs = dict(kwargs)
         final_kwargs["tile"] = tile
+        final_kwargs["composer_context"] = context
+        return final_kwargs
+
+    def _render_view(self, context, tile, view, args, kwargs):
+        """Helper method that safely renders a view."""
+
+        request = context["request"]
+        final_kwargs = self._get_view_kwargs(context, tile, kwargs)
 
         # Set recursion guard flag
         setattr(request, "_composer_suppress_rows_tag", 1)
-        html = ""
 
         # Call the view. Let any error propagate.
         result = view(request, *args, **final_kwargs)
+        return self._render_response(context, result)
+
+    def _render_response(self, context, result):
+        """Return the content of the response of a view. Clears the recursion
+        guard flag set before the view was called.
+        """
+
+        request = context["request"]
+        html = ""
         if isinstance(result, TemplateResponse):
-            # The result of a class based view
+            # The result of a class based view. Prefer rendering only the
+            # block that holds the content.
+            block_name = get_setting("fragment-block", "content")
+            if block_name:
+                fragment = render_fragment(result, block_name)
+                if fragment is not None:
+                    delattr(request, "_composer_suppress_rows_tag")
+                    return fragment
             result.render()
-            html = result.rendered_content
+            html = result.content.decode(result.charset)
         elif isinstance(result, HttpResponse):
             # Old-school view
-            html = result.content
+            html = result.content.decode(result.charset)
 
         # Clear flag
         delattr(request, "_composer_suppress_rows_tag")
@@ -122,87 +216,105 @@ class TileNode(template.Node):
         # Extract content div if any. This is typically needed for views
         # that extend base.html, but we are only interested in the actual
         # view content.
-        soup = BeautifulSoup(html)
-        content = soup.find("div", id="content")
-        if content:
-            return content.encode_contents()
+        content = extract_content(html)
+        if content is not None:
+            return content
 
         # No content div found
         return html
 
+    def _render_content(self, context, tile, content):
+        """Render content with the template for the tile style, or return
+        the content as is if there is no such template.
+        """
+
+        style_template = get_style_template(tile.style or "tile")
+        if style_template is None:
+            return content
+        with context.push(object=None, content=content):
+            return self._render_template(style_template, context)
+
+    def _render_template(self, tile_template, context):
+        """Render a template from the loader with the current context instead
+        of a flattened copy of it.
+        """
+
+        if isinstance(getattr(tile_template, "template", None), Template):
+            return tile_template.template.render(context)
+        # Not a Django template
+        return tile_template.render(context.flatten())
+
+    def render_include(self, context, tile, template_name):
+        """Return a placeholder that includes the tile from the tile view,
+        or None if the composer URLs are not installed.
+        """
+
+        try:
+            url = reverse("composer-tile", args=(tile.id,))
+        except NoReverseMatch:
+            return None
+        return render_to_string(template_name, {"tile": tile, "url": url})
+
     def render(self, context):
         tile = self.tile.resolve(context)
         request = context["request"]
+        if not getattr(request, "_composer_render_deferred", False):
+            html = None
+            if tile.esi and get_setting("esi"):
+                html = self.render_include(
+                    context, tile, "composer/tile_esi.html"
+                )
+            elif tile.deferred:
+                html = self.render_include(
+                    context, tile, "composer/tile_deferred.html"
+                )
+            if html is not None:
+                return html
+        prerendered = getattr(request, "_composer_prerendered", {})
+        if tile.id in prerendered:
+            return prerendered.pop(tile.id)
+        return self.render_cached(context, tile)
+
+    def render_cached(self, context, tile):
+        if not tile.cache_timeout:
+            return self.render_tile(context, tile)
+
+        return get_or_build(
+            get_tile_cache_key(tile, context["request"]),
+            get_version("tile", tile.id),
+            lambda: self.render_tile(context, tile),
+            tile.cache_timeout
+        )
 
+    def render_tile(self, context, tile):
         if tile.view_name:
+            # Resolving a view name to a view is slow because it has to pass
+            # through the url, so the result is remembered.
             try:
-                url = reverse(tile.view_name)
+                view, args, kwargs = resolve_view_name(tile.view_name)
             except NoReverseMatch:
                 return "No reverse match for %s" % tile.view_name
-            content = self._render_url(context, tile, url)
-            with context.push():
-                context["object"] = None
-                context["content"] = content
-                try:
-                    return render_to_string(
-                        "composer/inclusion_tags/%s.html" % tile.style or "tile",
-                        context.flatten()
-                    )
-                except template.TemplateDoesNotExist:
-                    return content
+            content = self._render_view(context, tile, view, args, kwargs)
+            return self._render_content(context, tile, content)
 
         if tile.target:
             with context.push():
                 obj = tile.target
                 context["object"] = obj
 
-                # Template names follow typical Django naming convention, but
-                # also traverse upwards over inheritance hierarchy.
-                template_names = []
-                ct = ContentType.objects.get_for_model(obj._meta.model)
-                kls = obj._meta.model
-                while ct.model != "model":
-                    template_names.extend((
-                        "%s/inclusion_tags/%s_%s.html" % \
-                            (ct.app_label, ct.model, tile.style or "tile"),
-                        "%s/inclusion_tags/%s.html" % \
-                            (ct.app_label, tile.style or "tile"),
-                    ))
-                    kls = kls.__bases__[0]
-                    if kls == models.Model:
-                        break
-                    ct = ContentType.objects.get_for_model(kls)
-
-                for template_name in template_names:
-                    try:
-                        return render_to_string(template_name, context.flatten())
-                    except template.TemplateDoesNotExist:
-                        pass
+                tile_template = get_target_template(
+                    obj._meta.model, tile.style or "tile"
+                )
+                if tile_template is not None:
+                    return self._render_template(tile_template, context)
 
                 # We couldn't find a suitable template. Attempt get_absolute_url.
                 url = getattr(tile.target, "get_absolute_url", lambda: None)()
                 if url:
                     content = self._render_url(context, tile, url)
-                    context["object"] = None
-                    context["content"] = content
-                    try:
-                        return render_to_string(
-                            "composer/inclusion_tags/%s.html" % tile.style or "tile",
-                            context.flatten()
-                        )
-                    except template.TemplateDoesNotExist:
-                        return content
+                    return self._render_content(context, tile, content)
 
         if tile.content:
-            with context.push():
-                context["object"] = None
-                context["content"] = tile.content
-                try:
-                    return render_to_string(
-                        "composer/inclusion_tags/%s.html" % tile.style or "tile",
-                        context.flatten()
-                    )
-                except template.TemplateDoesNotExist:
-                    return tile.content
+            return self._render_content(context, tile, tile.content)
 
         return "The tile id=%s could not be rendered" % tile.id
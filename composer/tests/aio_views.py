@@ -0,0 +1,8 @@
+import asyncio
+
+from django.http import HttpResponse
+
+
+async def async_view(request, **kwargs):
+    await asyncio.sleep(0)
+    return HttpResponse("<div id=\"content\">I am async</div>")
@@ -0,0 +1,49 @@
+"""Compare extracting the content div of large pages with the streaming
+extractor against BeautifulSoup, which composer used before. BeautifulSoup
+must be installed. Run with:
+
+    python -m composer.tests.benchmarks.content_extract
+"""
+from __future__ import print_function
+
+import timeit
+
+from bs4 import BeautifulSoup
+
+from composer.extract import extract_content
+
+
+def make_page(paragraphs):
+    body = "\n".join(
+        '<div class="item"><p>Item <a href="/%s/">%s</a></p></div>' % (i, i)
+        for i in range(paragraphs)
+    )
+    return """<html><head><title>Page</title></head><body>
+<div id="header"><ul><li>Home</li><li>About</li></ul></div>
+<div id="content">%s</div>
+<div id="footer">%s</div>
+</body></html>""" % (body, body)
+
+
+def with_soup(html):
+    return BeautifulSoup(html, "html.parser").find(
+        "div", id="content"
+    ).encode_contents()
+
+
+def main():
+    for paragraphs in (100, 1000, 10000):
+        html = make_page(paragraphs)
+        print("%s kB page" % (len(html) // 1024))
+        for name, func in (
+            ("BeautifulSoup", with_soup), ("extract_content", extract_content)
+        ):
+            number = max(1, 1000 // paragraphs)
+            elapsed = min(
+                timeit.repeat(lambda: func(html), number=number, repeat=3)
+            )
+            print("    %-16s %9.2f ms" % (name, elapsed / number * 1000))
+
+
+if __name__ == "__main__":
+    main()
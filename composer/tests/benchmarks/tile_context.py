@@ -0,0 +1,117 @@
+"""Compare the memory allocated while rendering tiles with a flattened copy
+of the context, as composer did before, with rendering them in the context
+itself. The page context holds 200 variables and the slot 100 markdown tiles
+and 100 view tiles. No database is needed. Run with:
+
+    python -m composer.tests.benchmarks.tile_context
+"""
+from __future__ import print_function
+
+import os
+import timeit
+import tracemalloc
+
+import django
+
+
+TILES = 100
+VARIABLES = 200
+
+
+def flattened_tile_node():
+    """A tile node that renders like composer did before, for comparison."""
+
+    from django.template import TemplateDoesNotExist
+    from django.template.loader import render_to_string
+    from composer.templatetags.composer_tags import TileNode
+
+    class FlattenedTileNode(TileNode):
+
+        def _get_view_kwargs(self, context, tile, kwargs):
+            final_kwargs = context.flatten()
+            del final_kwargs["request"]
+            final_kwargs.update(kwargs)
+            final_kwargs["tile"] = tile
+            return final_kwargs
+
+        def _render_content(self, context, tile, content):
+            with context.push():
+                context["object"] = None
+                context["content"] = content
+                try:
+                    return render_to_string(
+                        "composer/inclusion_tags/%s.html" % (tile.style or "tile"),
+                        context.flatten()
+                    )
+                except TemplateDoesNotExist:
+                    return content
+
+    return FlattenedTileNode("tile")
+
+
+def make_tiles():
+    from composer.models import TileData, get_markdown_version
+    from composer.utils import resolve_view_name
+
+    # Resolve once so the view resolution is not measured
+    resolve_view_name("bbb")
+    tiles = []
+    for i in range(TILES):
+        markdown = "Tile *%s*" % i
+        values = {
+            "id": i, "markdown": markdown, "rendered_markdown": markdown,
+            "markdown_version": get_markdown_version(markdown),
+            "style": "tile"
+        }
+        tiles.append(TileData(tuple(values.get(f) for f in TileData.fields)))
+        values = {"id": TILES + i, "view_name": "bbb", "style": "tile"}
+        tiles.append(TileData(tuple(values.get(f) for f in TileData.fields)))
+    return tiles
+
+
+def make_context():
+    from django.template import RequestContext
+    from django.test import RequestFactory
+
+    request = RequestFactory().get("/")
+    context = RequestContext(request, dict(
+        ("variable%s" % i, "value %s" % i) for i in range(VARIABLES)
+    ))
+    # Tiles are rendered inside the slot template
+    context.push(rows=[], request=request)
+    return context
+
+
+def render(node, context, tiles):
+    for tile in tiles:
+        node.render_cached(context, tile)
+
+
+def measure(name, node, tiles):
+    context = make_context()
+    render(node, context, tiles)
+    tracemalloc.start()
+    render(node, context, tiles)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    duration = min(timeit.repeat(
+        lambda: render(node, context, tiles), number=5, repeat=3
+    )) / 5
+    print("%-10s peak %9d bytes  render %7.2f ms" % (
+        name, peak, duration * 1000
+    ))
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "composer.tests.settings.20")
+    django.setup()
+    from composer.templatetags.composer_tags import TileNode
+
+    tiles = make_tiles()
+    print("%s tiles, %s context variables" % (len(tiles), VARIABLES))
+    measure("Flattened", flattened_tile_node(), tiles)
+    measure("Pushed", TileNode("tile"), tiles)
+
+
+if __name__ == "__main__":
+    main()
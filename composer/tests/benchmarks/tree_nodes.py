@@ -0,0 +1,86 @@
+"""Compare the memory and attribute access cost of the light weight tree
+nodes with wrapping model instances in the AttributeWrapper that composer
+used before, for a slot with 1000 tiles. No database is needed. Run with:
+
+    python -m composer.tests.benchmarks.tree_nodes
+"""
+from __future__ import print_function
+
+import os
+import pickle
+import timeit
+import tracemalloc
+
+import django
+
+
+TILES = 1000
+
+
+class AttributeWrapper:
+    """The wrapper composer used before the tree nodes, for comparison."""
+
+    def __init__(self, obj, **kwargs):
+        self._obj = obj
+        self._attributes = {}
+        for k, v in kwargs.items():
+            self._attributes[k] = v
+
+    def __getattr__(self, key):
+        if key in self._attributes:
+            return self._attributes[key]
+        return getattr(self._obj, key)
+
+    def __setstate__(self, dict):
+        self.__dict__.update(dict)
+
+
+def build_wrapped():
+    from composer.models import Tile
+    return [
+        AttributeWrapper(
+            Tile(id=i, position=i, markdown="Tile %s" % i, class_name="c"),
+            target=None
+        ) for i in range(TILES)
+    ]
+
+
+def build_nodes():
+    from composer.models import TileData
+    return [
+        TileData(tuple(
+            {"id": i, "position": i, "markdown": "Tile %s" % i,
+             "style": "tile", "class_name": "c"}.get(field)
+            for field in TileData.fields
+        )) for i in range(TILES)
+    ]
+
+
+def read(tiles):
+    for tile in tiles:
+        tile.id, tile.class_name, tile.view_name, tile.style, tile.target
+
+
+def measure(name, build):
+    tracemalloc.start()
+    tiles = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    build_time = min(timeit.repeat(build, number=10, repeat=3)) / 10
+    read_time = min(timeit.repeat(lambda: read(tiles), number=100, repeat=3)) / 100
+    pickled = len(pickle.dumps(tiles, pickle.HIGHEST_PROTOCOL))
+    print("%-16s memory %8d bytes  build %7.2f ms  read %7.3f ms  pickle %8d bytes" % (
+        name, size, build_time * 1000, read_time * 1000, pickled
+    ))
+
+
+def main():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "composer.tests.settings.20")
+    django.setup()
+    print("%s tiles" % TILES)
+    measure("AttributeWrapper", build_wrapped)
+    measure("TileData", build_nodes)
+
+
+if __name__ == "__main__":
+    main()
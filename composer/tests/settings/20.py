@@ -63,3 +63,6 @@ SITE_ID = 1
 STATIC_URL = "/static/"
 
 SECRET_KEY = "SECRET_KEY"
+
+# The tests run in a single process
+SILENCED_SYSTEM_CHECKS = ["composer.W001"]
@@ -0,0 +1,84 @@
+import sys
+import unittest
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TransactionTestCase
+try:
+    from django.urls import reverse
+except ImportError:
+    from django.core.urlresolvers import reverse
+
+from composer.models import Column, Row, Slot, Tile
+
+
+HOME_REGEX = "^" + reverse("home") + "$"
+
+
+# Worker threads use their own database connections, so the test data must be
+# committed.
+@unittest.skipIf(sys.version_info < (3, 5), "Requires Python 3.5")
+class AioTestCase(TransactionTestCase):
+    available_apps = [
+        "composer", "composer.tests", "django.contrib.contenttypes",
+        "django.contrib.sites"
+    ]
+
+    def setUp(self):
+        super(AioTestCase, self).setUp()
+        slot = Slot.objects.create(slot_name="header", url=HOME_REGEX)
+        slot.sites.set(Site.objects.all())
+        column = Column.objects.create(
+            row=Row.objects.create(slot=slot), width=6
+        )
+        self.tiles = [
+            Tile.objects.create(
+                column=column, position=position, view_name=view_name
+            ) for position, view_name in enumerate(("async", "bbb"))
+        ]
+
+    def render(self):
+        import asyncio
+        from composer import aio
+
+        request = RequestFactory().get(reverse("home"))
+        request.user = AnonymousUser()
+        loop = asyncio.new_event_loop()
+        try:
+            content = loop.run_until_complete(
+                aio.render_to_string("tests/home.html", request=request)
+            )
+        finally:
+            loop.close()
+        return request, content
+
+    def test_render_to_string(self):
+        request, content = self.render()
+
+        # Both tiles are rendered in order
+        self.assertIn("I am async", content)
+        self.assertIn("I am bbb", content)
+        self.assertLess(content.index("I am async"), content.index("I am bbb"))
+        self.assertEqual(request._composer_prerendered, {})
+
+    def test_no_reverse_match(self):
+        Tile.objects.filter(pk=self.tiles[0].pk).update(
+            view_name="does-not-exist"
+        )
+        request, content = self.render()
+        self.assertIn("No reverse match for does-not-exist", content)
+        self.assertIn("I am bbb", content)
+
+    def test_context(self):
+        # Tiles see the context the slot template renders them in
+        Tile.objects.filter(
+            pk__in=[tile.pk for tile in self.tiles]
+        ).update(style="boxed")
+        request, content = self.render()
+        for tile in self.tiles:
+            self.assertIn("[tile=%s col=6]" % tile.id, content)
+
+    def test_request_required(self):
+        from composer import aio
+
+        self.assertRaises(TypeError, aio.render_to_string, "tests/home.html")
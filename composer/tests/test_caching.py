@@ -0,0 +1,123 @@
+import shutil
+import tempfile
+
+from django.core.cache import caches
+from django.db import transaction
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from composer.caching import (
+    acquire_lock, bump_version, get_or_build, get_version, pack, release_lock,
+    set_packed
+)
+from composer.checks import check_cache
+
+
+class CachingMixin(object):
+    """Tests for the stale-while-revalidate and single-flight behaviour of
+    get_or_build. Subclasses set the cache backend.
+    """
+
+    def setUp(self):
+        super(CachingMixin, self).setUp()
+        caches["composer"].clear()
+        self.calls = []
+
+    def build(self):
+        self.calls.append(1)
+        return "new"
+
+    def test_build_once(self):
+        self.assertEqual(get_or_build("composer:k", "v1", self.build, 60), "new")
+        self.assertEqual(get_or_build("composer:k", "v1", self.build, 60), "new")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_stale_version(self):
+        set_packed("composer:k", "v1", "old", 60)
+
+        # Another process is rebuilding, so the previous value is served
+        self.assertTrue(acquire_lock("composer:k"))
+        self.assertEqual(get_or_build("composer:k", "v2", self.build, 60), "old")
+        self.assertEqual(self.calls, [])
+
+        # Once the lock is released the value is rebuilt
+        release_lock("composer:k")
+        self.assertEqual(get_or_build("composer:k", "v2", self.build, 60), "new")
+        self.assertEqual(len(self.calls), 1)
+
+    def test_expired(self):
+        caches["composer"].set("composer:k", pack("v1", "old", -1), 60)
+        self.assertTrue(acquire_lock("composer:k"))
+        self.assertEqual(get_or_build("composer:k", "v1", self.build, 60), "old")
+        release_lock("composer:k")
+        self.assertEqual(get_or_build("composer:k", "v1", self.build, 60), "new")
+
+    def test_lock_expired(self):
+        # With nothing to serve the value is built once the lock expires
+        self.assertTrue(acquire_lock("composer:k"))
+        self.assertEqual(get_or_build("composer:k", "v1", self.build, 60), "new")
+        self.assertEqual(len(self.calls), 1)
+
+
+@override_settings(
+    CACHES={"composer": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "composer-caching-tests"
+    }},
+    COMPOSER={"cache": "composer", "lock-timeout": 0.2}
+)
+class LocMemCachingTestCase(CachingMixin, SimpleTestCase):
+    pass
+
+
+class FileBasedCachingTestCase(CachingMixin, SimpleTestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.location = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            CACHES={"composer": {
+                "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                "LOCATION": cls.location
+            }},
+            COMPOSER={"cache": "composer", "lock-timeout": 0.2}
+        )
+        cls.settings_override.enable()
+        super(FileBasedCachingTestCase, cls).setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super(FileBasedCachingTestCase, cls).tearDownClass()
+        cls.settings_override.disable()
+        shutil.rmtree(cls.location)
+
+
+class BumpVersionTestCase(TransactionTestCase):
+    available_apps = ["composer"]
+
+    def test_bump_on_commit(self):
+        with transaction.atomic():
+            bump_version("test")
+            version = get_version("test")
+
+        # Values built before the commit are invalidated too
+        self.assertNotEqual(get_version("test"), version)
+
+
+class CheckCacheTestCase(SimpleTestCase):
+
+    def test_check_cache(self):
+        for backend, ids in (
+            ("locmem.LocMemCache", ["composer.W001"]),
+            ("dummy.DummyCache", ["composer.W001"]),
+            ("filebased.FileBasedCache", []),
+        ):
+            with override_settings(
+                CACHES={"composer": {
+                    "BACKEND": "django.core.cache.backends." + backend,
+                    "LOCATION": tempfile.gettempdir()
+                }},
+                COMPOSER={"cache": "composer"}
+            ):
+                self.assertEqual(
+                    [warning.id for warning in check_cache(None)], ids
+                )
@@ -0,0 +1,117 @@
+from django.contrib.sites.models import Site
+from django.test import RequestFactory, TestCase, override_settings
+
+from composer.context_processors import slots
+from composer.index import (
+    get_slot_index, get_slot_map_cache, invalidate_slot_indexes
+)
+from composer.models import Slot
+
+
+def get_slots(path):
+    return dict(slots(RequestFactory().get(path))["composer_slots"])
+
+
+class SlotsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(SlotsTestCase, cls).setUpTestData()
+        cls.slot = Slot.objects.create(slot_name="header", url="^/aaa/")
+        cls.slot.sites.set(Site.objects.all())
+        cls.slot_bbb = Slot.objects.create(slot_name="header", url="^/aaa/bbb/")
+        cls.slot_bbb.sites.set(Site.objects.all())
+
+    def setUp(self):
+        super(SlotsTestCase, self).setUp()
+        invalidate_slot_indexes()
+
+    def test_longest_url_wins(self):
+        self.assertEqual(get_slots("/aaa/bbb/"), {"header": self.slot_bbb})
+        self.assertEqual(get_slots("/aaa/ccc/"), {"header": self.slot})
+
+    def test_no_queries_once_indexed(self):
+        get_slots("/aaa/bbb/")
+        with self.assertNumQueries(0):
+            get_slots("/aaa/bbb/")
+
+    def test_invalidation(self):
+        self.assertEqual(get_slots("/aaa/bbb/"), {"header": self.slot_bbb})
+        self.slot_bbb.sites.clear()
+        self.assertEqual(get_slots("/aaa/bbb/"), {"header": self.slot})
+        slot = Slot.objects.create(slot_name="footer", url="^/aaa/")
+        slot.sites.set(Site.objects.all())
+        self.assertEqual(
+            get_slots("/aaa/bbb/"), {"header": self.slot, "footer": slot}
+        )
+        Slot.objects.filter(pk=self.slot.pk).get().delete()
+        self.assertEqual(get_slots("/aaa/bbb/"), {"footer": slot})
+
+    def test_slot_index_timeout(self):
+        # A change no signal reports is only seen once the index expires
+        get_slots("/aaa/bbb/")
+        Slot.objects.filter(pk=self.slot_bbb.pk).update(url="^/bbb/")
+        self.assertEqual(get_slots("/aaa/bbb/"), {"header": self.slot_bbb})
+        invalidate_slot_indexes()
+        with override_settings(COMPOSER={"slot-index-timeout": 0}):
+            get_slots("/aaa/bbb/")
+            Slot.objects.filter(pk=self.slot_bbb.pk).update(url="^/aaa/bbb/")
+            self.assertEqual(get_slots("/aaa/bbb/"), {"header": self.slot_bbb})
+
+    def test_slot_map_cache(self):
+        cache = get_slot_map_cache()
+        hits, misses = cache.hits, cache.misses
+        get_slots("/aaa/bbb/")
+        get_slots("/aaa/bbb/")
+        self.assertEqual((cache.hits - hits, cache.misses - misses), (1, 1))
+
+        # Any slot change drops the cached slot maps
+        self.slot.save()
+        self.assertEqual(get_slots("/aaa/bbb/"), {"header": self.slot_bbb})
+        self.assertEqual((cache.hits - hits, cache.misses - misses), (1, 2))
+
+    def test_match_path_info(self):
+        slot = Slot.objects.create(slot_name="footer", url="^/aaa/bbb/$")
+        slot.sites.set(Site.objects.all())
+        self.assertNotIn("footer", get_slots("/aaa/bbb/?utm_source=x"))
+        with override_settings(COMPOSER={"match-path-info": True}):
+            self.assertEqual(
+                get_slots("/aaa/bbb/?utm_source=x")["footer"], slot
+            )
+
+    def test_lazy(self):
+        request = RequestFactory().get("/aaa/bbb/")
+        get_slots("/")
+
+        # Nothing is resolved until a slot name is asked for
+        with self.assertNumQueries(0):
+            composer_slots = slots(request)["composer_slots"]
+        self.slot.save()
+        with self.assertNumQueries(1):
+            composer_slots.declare(["header", "footer"])
+        with self.assertNumQueries(0):
+            self.assertEqual(composer_slots["header"], self.slot_bbb)
+            self.assertNotIn("footer", composer_slots)
+
+        # The mapping is memoized on the request
+        self.assertIs(slots(request)["composer_slots"], composer_slots)
+
+    def test_bool(self):
+        # True only if a slot applies to the page
+        for path, expected in (("/aaa/", True), ("/bbb/", False)):
+            composer_slots = slots(RequestFactory().get(path))["composer_slots"]
+            self.assertEqual(bool(composer_slots), expected)
+
+    def test_declared_slot_names_only(self):
+        # Header slots without rows need a template we do not have
+        Slot.objects.filter(slot_name="header").delete()
+        for slot_name in ("content", "sidebar", "promo"):
+            slot = Slot.objects.create(slot_name=slot_name, url="^/aaa/")
+            slot.sites.set(Site.objects.all())
+        self.client.get("/aaa/")
+
+        # aaa.html overrides the content block, so content slots are never
+        # fetched. Neither are slots the templates do not mention.
+        index = get_slot_index(Site.objects.get_current().id)
+        self.assertEqual(set(index.matchers.keys()), set(["header", "footer"]))
+        self.assertFalse(index.complete)
@@ -0,0 +1,28 @@
+from django.test import SimpleTestCase
+
+from composer.extract import extract_content
+
+
+class ExtractContentTestCase(SimpleTestCase):
+
+    def test_extract(self):
+        html = """<html><body>
+<div id="header"><div>Header</div></div>
+<div class="main" id="content">
+    <div class="a">A <div>B</div></div><br><img src="x.png"/>
+    <script>var s = "</div>";</script>
+</div>
+<div id="footer">Footer</div>
+</body></html>"""
+        self.assertEqual(extract_content(html), """
+    <div class="a">A <div>B</div></div><br><img src="x.png"/>
+    <script>var s = "</div>";</script>
+""")
+
+    def test_no_content(self):
+        self.assertEqual(extract_content("<div>content</div>"), None)
+        self.assertEqual(extract_content('<div id="content">open'), None)
+
+    def test_large_document(self):
+        html = '<div id="content">%s</div>' % ("<p>\nx</p>" * 10000)
+        self.assertEqual(extract_content(html), "<p>\nx</p>" * 10000)
@@ -0,0 +1,33 @@
+from django.template.response import TemplateResponse
+from django.test import RequestFactory, TestCase
+
+from composer.fragments import render_fragment
+
+
+class RenderFragmentTestCase(TestCase):
+
+    def get_response(self, template_name):
+        return TemplateResponse(RequestFactory().get("/"), template_name, {})
+
+    def test_block(self):
+        self.assertHTMLEqual(
+            render_fragment(self.get_response("tests/bbb.html"), "content"),
+            "I am bbb. I live at /aaa/bbb/."
+        )
+
+        # A block the child does not override comes from the parent
+        self.assertHTMLEqual(
+            render_fragment(self.get_response("tests/home.html"), "content"),
+            "Content slot"
+        )
+
+    def test_not_possible(self):
+        # The template does not extend anything
+        self.assertEqual(
+            render_fragment(self.get_response("tests/header.html"), "content"),
+            None
+        )
+        self.assertEqual(
+            render_fragment(self.get_response("tests/bbb.html"), "sidebar"),
+            None
+        )
@@ -0,0 +1,57 @@
+import re
+from collections import namedtuple
+
+from django.test import SimpleTestCase
+
+from composer import matcher
+
+
+FakeSlot = namedtuple("FakeSlot", ("slot_name", "url"))
+
+
+class MatcherTestCase(SimpleTestCase):
+
+    def test_analyse(self):
+        self.assertEqual(matcher.analyse("^/$"), (matcher.EXACT, "/"))
+        self.assertEqual(
+            matcher.analyse(r"^/about\-us/"), (matcher.PREFIX, "/about-us/")
+        )
+        self.assertEqual(
+            matcher.analyse(r"^/news/\d+/$"), (matcher.ANCHORED, "/news/")
+        )
+        self.assertEqual(
+            matcher.analyse("^/abouts?/"), (matcher.ANCHORED, "/about")
+        )
+        self.assertEqual(
+            matcher.analyse("/campaign/"), (matcher.CONTAINS, "/campaign/")
+        )
+        self.assertEqual(matcher.analyse("^/a/|^/b/"), (matcher.DYNAMIC, ""))
+        self.assertEqual(matcher.analyse("(?i)^/a/"), (matcher.DYNAMIC, ""))
+        self.assertEqual(
+            matcher.analyse("^/a/(b|c)/"), (matcher.ANCHORED, "/a/")
+        )
+
+    def test_same_result_as_linear_scan(self):
+        slots = [
+            FakeSlot("content", "^/$"),
+            FakeSlot("header", "^/"),
+            FakeSlot("header", "^/about-us/"),
+            FakeSlot("header", r"^/about-us/team/\w+/$"),
+            FakeSlot("footer", "/campaign/"),
+            FakeSlot("footer", "^/about-us/$"),
+            FakeSlot("sidebar", ".*/print/$"),
+            FakeSlot("sidebar", "^/a/|^/about"),
+            FakeSlot("content", "^/abouts?/"),
+        ]
+        slots = sorted(slots, key=lambda item: len(item.url), reverse=True)
+        slot_matcher = matcher.SlotMatcher(slots)
+
+        for path in (
+            "/", "/?a=1", "/about-us/", "/about-us/team/jane/",
+            "/about-us/team/", "/abou/", "/x/campaign/print/", "/a/"
+        ):
+            expected = {}
+            for slot in slots:
+                if slot.slot_name not in expected and re.search(slot.url, path):
+                    expected[slot.slot_name] = slot
+            self.assertEqual(slot_matcher.match(path), expected, path)
@@ -1,5 +1,7 @@
+import re
+
 from django.contrib.sites.models import Site
-from django.test import TestCase
+from django.test import TestCase, override_settings
 try:
     from django.urls import reverse
 except ImportError:
@@ -52,6 +54,14 @@ class MiddleWareTestCase(TestCase):
             fetch_redirect_response=True
         )
 
+    def test_404_slash_single_query(self):
+        self.client.get("/not-a-four-o-four")
+
+        # The path with and without a slash is looked up in one query
+        with self.assertNumQueries(1):
+            response = self.client.get("/not-a-four-o-four")
+        self.assertEqual(response.status_code, 301)
+
     def test_404_no_slash_no_redirect(self):
         with self.settings(APPEND_SLASH=False):
             response = self.client.get("/not-a-four-o-four")
@@ -105,3 +115,61 @@ class MiddleWareTestCase(TestCase):
         self.assertEqual(response.status_code, 405)
         response = self.client.trace("/not-a-four-o-four/")
         self.assertEqual(response.status_code, 405)
+
+    def test_404_without_queries(self):
+        self.client.get("/does-not-exist/")
+
+        # Paths that can not match a content slot do not query
+        with self.assertNumQueries(0):
+            response = self.client.get("/does-not-exist-either/")
+        self.assertEqual(response.status_code, 404)
+
+        # Until a content slot with the path is added
+        slot = Slot.objects.create(
+            slot_name="content", url="/does-not-exist-either/"
+        )
+        slot.sites.set(Site.objects.all())
+        response = self.client.get("/does-not-exist-either/")
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(COMPOSER={"esi": True})
+class ESITestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(ESITestCase, cls).setUpTestData()
+        cls.slot = Slot.objects.create(slot_name="header", url="^/$")
+        cls.slot.sites.set(Site.objects.all())
+        column = Column.objects.create(row=Row.objects.create(slot=cls.slot))
+        cls.tile = Tile.objects.create(
+            column=column, view_name="bbb", esi=True, cache_timeout=300
+        )
+        Tile.objects.create(column=column, position=1, markdown="Per page")
+
+    def process_esi(self, content):
+        """Act like a caching proxy that processes Edge Side Includes."""
+
+        def include(match):
+            response = self.client.get(match.group(1))
+            self.assertIn("max-age=300", response["Cache-Control"])
+            return response.content.decode("utf-8")
+
+        return re.sub(r'<esi:include src="([^"]+)" />', include, content)
+
+    def test_esi(self):
+        response = self.client.get(reverse("home"))
+        self.assertEqual(response["Surrogate-Control"], 'content="ESI/1.0"')
+        content = response.content.decode("utf-8")
+        self.assertNotIn("I am bbb", content)
+        self.assertIn("Per page", content)
+
+        content = self.process_esi(content)
+        self.assertIn("I am bbb", content)
+        self.assertLess(content.index("I am bbb"), content.index("Per page"))
+
+    def test_no_esi(self):
+        with self.settings(COMPOSER={}):
+            response = self.client.get(reverse("home"))
+        self.assertFalse(response.has_header("Surrogate-Control"))
+        self.assertIn("I am bbb", response.content.decode("utf-8"))
@@ -0,0 +1,46 @@
+from django.contrib.sites.models import Site
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils.six import StringIO
+
+from composer.models import Column, Row, Slot, Tile
+
+
+class TileMarkdownTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TileMarkdownTestCase, cls).setUpTestData()
+        cls.slot = Slot.objects.create(slot_name="content", url="^/$")
+        cls.slot.sites.set(Site.objects.all())
+        cls.column = Column.objects.create(
+            row=Row.objects.create(slot=cls.slot)
+        )
+
+    def test_rendered_on_save(self):
+        tile = Tile.objects.create(column=self.column, markdown="**Bold**")
+        self.assertEqual(tile.rendered_markdown, "<p><strong>Bold</strong></p>")
+
+        # The stored HTML is used as long as it is current
+        Tile.objects.filter(pk=tile.pk).update(rendered_markdown="<p>Stored</p>")
+        self.assertEqual(Tile.objects.get(pk=tile.pk).content, "<p>Stored</p>")
+
+        # Changing the markdown settings makes the stored HTML stale
+        with override_settings(COMPOSER={
+            "markdown-extensions": ["markdown.extensions.extra"]
+        }):
+            self.assertEqual(
+                Tile.objects.get(pk=tile.pk).content,
+                "<p><strong>Bold</strong></p>"
+            )
+
+    def test_backfill(self):
+        tile = Tile.objects.create(column=self.column)
+        Tile.objects.filter(pk=tile.pk).update(markdown="*Emphasis*")
+        out = StringIO()
+        call_command("composer_render_markdown", stdout=out)
+        self.assertIn("Rendered markdown for 1 tiles.", out.getvalue())
+        self.assertEqual(
+            Tile.objects.get(pk=tile.pk).rendered_markdown,
+            "<p><em>Emphasis</em></p>"
+        )
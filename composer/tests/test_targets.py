@@ -0,0 +1,50 @@
+from django.contrib.sites.models import Site
+from django.test import TestCase
+
+from composer.models import Column, Row, Slot, Tile
+from composer.targets import get_target_tiles
+from composer.tests.models import DummyModel1, DummyModel2
+
+
+class TargetsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TargetsTestCase, cls).setUpTestData()
+        cls.dm_one = DummyModel1.objects.create(title="One")
+        cls.dm_two = DummyModel2.objects.create(title="Two")
+        slot = Slot.objects.create(slot_name="content", url="^/$")
+        slot.sites.set(Site.objects.all())
+        column = Column.objects.create(row=Row.objects.create(slot=slot))
+        cls.tiles = []
+        for i in range(2):
+            tile = Tile(column=column)
+            tile.target = cls.dm_two
+            tile.save()
+            cls.tiles.append(tile)
+
+    def test_target_tiles(self):
+        slot_id = self.tiles[0].column.row.slot_id
+        self.assertEqual(
+            sorted(get_target_tiles(DummyModel2, self.dm_two.pk)),
+            sorted((tile.id, slot_id) for tile in self.tiles)
+        )
+
+        # Tiles are never queried for models that are not the target of
+        # any tile.
+        with self.assertNumQueries(0):
+            self.assertEqual(get_target_tiles(DummyModel1, self.dm_one.pk), [])
+        with self.assertNumQueries(1):
+            DummyModel1.objects.create(title="Three")
+
+        # Changing a tile rebuilds the index
+        tile = self.tiles[0]
+        tile.target = self.dm_one
+        tile.save()
+        self.assertEqual(
+            get_target_tiles(DummyModel1, self.dm_one.pk), [(tile.id, slot_id)]
+        )
+        self.assertEqual(
+            get_target_tiles(DummyModel2, self.dm_two.pk),
+            [(self.tiles[1].id, slot_id)]
+        )
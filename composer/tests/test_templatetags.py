@@ -1,5 +1,5 @@
 from django.contrib.sites.models import Site
-from django.test import TestCase
+from django.test import TestCase, override_settings
 try:
     from django.urls import reverse
 except ImportError:
@@ -231,3 +231,307 @@ class TemplateTagsContextTestCase(TestCase):
         <div id="footer">
             Footer slot
         </div>""", response.content.decode("utf-8"))
+
+
+class TemplateTagsViewKwargsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsViewKwargsTestCase, cls).setUpTestData()
+        cls.slot = Slot.objects.create(slot_name="header", url=HOME_REGEX)
+        cls.slot.sites.set(Site.objects.all())
+        Tile.objects.create(
+            column=Column.objects.create(row=Row.objects.create(slot=cls.slot)),
+            view_name="view_kwargs"
+        )
+
+    def test_view_kwargs(self):
+        # Views only receive the tile and the context it is rendered in
+        response = self.client.get(reverse("home"))
+        self.assertIn("composer_context tile", response.content.decode("utf-8"))
+
+
+class TemplateTagsBatchTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsBatchTestCase, cls).setUpTestData()
+        for slot_name in ("header", "footer"):
+            slot = Slot.objects.create(slot_name=slot_name, url="^" + reverse("aaa"))
+            slot.sites.set(Site.objects.all())
+            Tile.objects.create(
+                column=Column.objects.create(row=Row.objects.create(slot=slot)),
+                markdown="I am the %s" % slot_name
+            )
+
+    def test_single_query(self):
+        self.client.get(reverse("aaa"))
+
+        # The header and footer trees are now cached
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("aaa"))
+        content = response.content.decode("utf-8")
+        self.assertIn("I am the header", content)
+        self.assertIn("I am the footer", content)
+
+        # Changing a tile fetches only its own slot's tree again
+        tile = Tile.objects.get(markdown="I am the footer")
+        tile.markdown = "I am the new footer"
+        tile.save()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("aaa"))
+        self.assertIn("I am the new footer", response.content.decode("utf-8"))
+
+
+class TemplateTagsViewTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsViewTestCase, cls).setUpTestData()
+        cls.slot = Slot.objects.create(slot_name="header", url=HOME_REGEX)
+        cls.slot.sites.set(Site.objects.all())
+        cls.tile = Tile.objects.create(
+            column=Column.objects.create(row=Row.objects.create(slot=cls.slot)),
+            view_name="bbb"
+        )
+
+    def test_content_extracted(self):
+        # Only the content div of the bbb page is rendered in the tile
+        response = self.client.get(reverse("home"))
+        self.assertHTMLEqual("""
+        <div id="header">
+            <div class="composer-row None">
+                <div class="composer-column composer-column-8 None">
+                    <div class="composer-tile None" data-oid="%s">
+                        I am bbb. I live at /aaa/bbb/.
+                    </div>
+                </div>
+            </div>
+        </div>
+        <div id="content">
+            Content slot
+        </div>
+        <div id="footer">
+            Footer slot
+        </div>""" % self.tile.id, response.content.decode("utf-8"))
+
+
+class TemplateTagsTileCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsTileCacheTestCase, cls).setUpTestData()
+        cls.dm_one = DummyModel2.objects.create(title="One")
+        cls.slot = Slot.objects.create(slot_name="content", url=HOME_REGEX)
+        cls.slot.sites.set(Site.objects.all())
+        cls.tile = Tile.objects.create(
+            column=Column.objects.create(row=Row.objects.create(slot=cls.slot)),
+            cache_timeout=60,
+            cache_vary="site,language,authentication"
+        )
+        cls.tile.target = cls.dm_one
+        cls.tile.save()
+
+    def test_cached_tile(self):
+        response = self.client.get(reverse("home"))
+        self.assertIn(
+            "I am a tile for DummyModel2 One", response.content.decode("utf-8")
+        )
+
+        # A change to the target alone does not reach the cached tile
+        DummyModel2.objects.filter(pk=self.dm_one.pk).update(title="Two")
+        response = self.client.get(reverse("home"))
+        self.assertIn(
+            "I am a tile for DummyModel2 One", response.content.decode("utf-8")
+        )
+
+        # Saving the tile invalidates it
+        Tile.objects.get(pk=self.tile.pk).save()
+        response = self.client.get(reverse("home"))
+        self.assertIn(
+            "I am a tile for DummyModel2 Two", response.content.decode("utf-8")
+        )
+
+    def test_target_changed(self):
+        self.client.get(reverse("home"))
+
+        # Saving the target evicts the cached tile
+        dm_one = DummyModel2.objects.get(pk=self.dm_one.pk)
+        dm_one.title = "Three"
+        dm_one.save()
+        response = self.client.get(reverse("home"))
+        self.assertIn(
+            "I am a tile for DummyModel2 Three", response.content.decode("utf-8")
+        )
+
+
+class TemplateTagsSlotCacheTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsSlotCacheTestCase, cls).setUpTestData()
+        cls.dm_one = DummyModel2.objects.create(title="One")
+        cls.slot = Slot.objects.create(
+            slot_name="content", url=HOME_REGEX, cache_timeout=60
+        )
+        cls.slot.sites.set(Site.objects.all())
+        cls.tile = Tile.objects.create(
+            column=Column.objects.create(row=Row.objects.create(slot=cls.slot))
+        )
+        cls.tile.target = cls.dm_one
+        cls.tile.save()
+
+    def get_content(self):
+        return self.client.get(reverse("home")).content.decode("utf-8")
+
+    def test_cached_slot(self):
+        self.assertIn("I am a tile for DummyModel2 One", self.get_content())
+
+        # A change that sends no signal does not reach the cached slot
+        DummyModel2.objects.filter(pk=self.dm_one.pk).update(title="Two")
+        self.assertIn("I am a tile for DummyModel2 One", self.get_content())
+
+        # Saving the target of a tile evicts the slot
+        dm_one = DummyModel2.objects.get(pk=self.dm_one.pk)
+        dm_one.title = "Three"
+        dm_one.save()
+        self.assertIn("I am a tile for DummyModel2 Three", self.get_content())
+
+    def test_uncacheable_tile(self):
+        tile = Tile.objects.get(pk=self.tile.pk)
+        tile.uncacheable = True
+        tile.save()
+        self.assertIn("I am a tile for DummyModel2 One", self.get_content())
+        DummyModel2.objects.filter(pk=self.dm_one.pk).update(title="Two")
+        self.assertIn("I am a tile for DummyModel2 Two", self.get_content())
+
+    def test_tile_varies_by_request(self):
+        for cache_vary in ("language", "site,authentication"):
+            tile = Tile.objects.get(pk=self.tile.pk)
+            tile.cache_vary = cache_vary
+            tile.save()
+            self.get_content()
+            DummyModel2.objects.filter(pk=self.dm_one.pk).update(
+                title=cache_vary
+            )
+            self.assertIn(
+                "I am a tile for DummyModel2 %s" % cache_vary,
+                self.get_content()
+            )
+
+
+@override_settings(COMPOSER={"parallel-tiles": 4, "tile-timeout": 0.2})
+class TemplateTagsParallelTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsParallelTestCase, cls).setUpTestData()
+        slot = Slot.objects.create(slot_name="header", url=HOME_REGEX)
+        slot.sites.set(Site.objects.all())
+        column = Column.objects.create(row=Row.objects.create(slot=slot))
+        for position, view_name in enumerate(("bbb", "slow", "bbb")):
+            Tile.objects.create(
+                column=column, position=position, view_name=view_name
+            )
+
+    def test_parallel(self):
+        content = self.client.get(reverse("home")).content.decode("utf-8")
+
+        # The tiles are in order and the slow one timed out
+        self.assertEqual(content.count("I am bbb"), 2)
+        self.assertNotIn("I am slow", content)
+        self.assertLess(
+            content.index("I am bbb"), content.index("composer-tile-timeout")
+        )
+        self.assertLess(
+            content.index("composer-tile-timeout"), content.rindex("I am bbb")
+        )
+
+
+class TemplateTagsParallelContextTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsParallelContextTestCase, cls).setUpTestData()
+        slot = Slot.objects.create(slot_name="header", url=HOME_REGEX)
+        slot.sites.set(Site.objects.all())
+        column = Column.objects.create(
+            row=Row.objects.create(slot=slot), width=6
+        )
+        cls.tiles = [
+            Tile.objects.create(
+                column=column, position=position, view_name="bbb",
+                style="boxed"
+            ) for position in range(2)
+        ]
+
+    def test_context(self):
+        # Style templates see the same context in both modes
+        for composer in ({}, {"parallel-tiles": 2}):
+            with override_settings(COMPOSER=composer):
+                content = self.client.get(reverse("home")).content.decode(
+                    "utf-8"
+                )
+            for tile in self.tiles:
+                self.assertIn("[tile=%s col=6]" % tile.id, content)
+
+
+@override_settings(COMPOSER={"parallel-tiles": 1, "tile-timeout": 0.3})
+class TemplateTagsParallelQueuedTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsParallelQueuedTestCase, cls).setUpTestData()
+        slot = Slot.objects.create(slot_name="header", url=HOME_REGEX)
+        slot.sites.set(Site.objects.all())
+        column = Column.objects.create(row=Row.objects.create(slot=slot))
+        for position in range(4):
+            Tile.objects.create(
+                column=column, position=position, view_name="quick"
+            )
+
+    def test_queued(self):
+        # Together the tiles take longer than the timeout, but no tile does
+        content = self.client.get(reverse("home")).content.decode("utf-8")
+        self.assertEqual(content.count("I am quick"), 4)
+        self.assertNotIn("composer-tile-timeout", content)
+
+
+class TemplateTagsDeferredTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TemplateTagsDeferredTestCase, cls).setUpTestData()
+        cls.slot = Slot.objects.create(slot_name="header", url=HOME_REGEX)
+        cls.slot.sites.set(Site.objects.all())
+        cls.tile = Tile.objects.create(
+            column=Column.objects.create(row=Row.objects.create(slot=cls.slot)),
+            view_name="bbb",
+            deferred=True,
+            cache_timeout=60
+        )
+
+    def test_deferred(self):
+        url = reverse("composer-tile", args=(self.tile.id,))
+        content = self.client.get(reverse("home")).content.decode("utf-8")
+        self.assertNotIn("I am bbb", content)
+        self.assertIn('data-url="%s"' % url, content)
+
+        # The tile view renders the tile itself
+        response = self.client.get(url)
+        self.assertIn("I am bbb", response.content.decode("utf-8"))
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+    def test_uncacheable(self):
+        Tile.objects.filter(pk=self.tile.pk).update(uncacheable=True)
+        response = self.client.get(
+            reverse("composer-tile", args=(self.tile.id,))
+        )
+        self.assertIn("max-age=0", response["Cache-Control"])
+
+    def test_other_site(self):
+        self.slot.sites.clear()
+        response = self.client.get(
+            reverse("composer-tile", args=(self.tile.id,))
+        )
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,102 @@
+from django.contrib.sites.models import Site
+from django.test import TestCase
+
+from composer.models import Column, Row, Slot, Tile, build_rows
+from composer.trees import get_rows
+
+
+class TreesTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        super(TreesTestCase, cls).setUpTestData()
+        cls.slot = Slot.objects.create(slot_name="content", url="^/$")
+        cls.slot.sites.set(Site.objects.all())
+        cls.slot_empty = Slot.objects.create(slot_name="header", url="^/$")
+        for position in (1, 0):
+            row = Row.objects.create(
+                slot=cls.slot, position=position, class_name="row%s" % position
+            )
+            Tile.objects.create(
+                column=Column.objects.create(row=row, width=4),
+                markdown="Row %s" % position
+            )
+
+    def get_structure(self, rows):
+        return [
+            (row.class_name, [
+                (column.width, [tile.markdown for tile in column.tiles])
+                for column in row.columns
+            ]) for row in rows
+        ]
+
+    def test_cached_tree(self):
+        slots = [self.slot, self.slot_empty]
+        with self.assertNumQueries(1):
+            expected = build_rows(slots)
+        self.assertEqual(
+            self.get_structure(expected[self.slot.id]),
+            [("row0", [(4, ["Row 0"])]), ("row1", [(4, ["Row 1"])])]
+        )
+
+        get_rows(slots)
+        with self.assertNumQueries(0):
+            rows = get_rows(slots)
+        for slot in slots:
+            self.assertEqual(
+                self.get_structure(rows[slot.id]),
+                self.get_structure(expected[slot.id])
+            )
+
+    def test_invalidation(self):
+        get_rows([self.slot])
+        Row.objects.get(slot=self.slot, position=0).delete()
+        self.assertEqual(
+            self.get_structure(get_rows([self.slot])[self.slot.id]),
+            [("row1", [(4, ["Row 1"])])]
+        )
+        column = Column.objects.get(row__slot=self.slot)
+        column.width = 6
+        column.save()
+        self.assertEqual(
+            self.get_structure(get_rows([self.slot])[self.slot.id]),
+            [("row1", [(6, ["Row 1"])])]
+        )
+
+    def test_moved(self):
+        other = Slot.objects.create(slot_name="sidebar", url="^/$")
+        other_row = Row.objects.create(slot=other, class_name="other")
+        get_rows([self.slot, other])
+
+        # Moving a row, column or tile changes both slots
+        row = Row.objects.get(slot=self.slot, position=1)
+        row.slot = other
+        row.save()
+        rows = get_rows([self.slot, other])
+        self.assertEqual(
+            self.get_structure(rows[self.slot.id]), [("row0", [(4, ["Row 0"])])]
+        )
+        self.assertEqual(
+            self.get_structure(rows[other.id]), [("row1", [(4, ["Row 1"])])]
+        )
+
+        tile = Tile.objects.get(markdown="Row 1")
+        tile.column = Column.objects.get(row__slot=self.slot)
+        tile.position = 1
+        tile.save()
+        rows = get_rows([self.slot, other])
+        self.assertEqual(
+            self.get_structure(rows[self.slot.id]),
+            [("row0", [(4, ["Row 0", "Row 1"])])]
+        )
+        self.assertEqual(self.get_structure(rows[other.id]), [])
+
+        column = Column.objects.get(row__slot=self.slot)
+        column.row = other_row
+        column.save()
+        rows = get_rows([self.slot, other])
+        self.assertEqual(self.get_structure(rows[self.slot.id]), [])
+        self.assertEqual(
+            self.get_structure(rows[other.id]),
+            [("other", [(4, ["Row 0", "Row 1"])])]
+        )
@@ -0,0 +1,112 @@
+import django
+from django.template import loader
+from django.test import SimpleTestCase, override_settings
+try:
+    from django.urls import NoReverseMatch
+except ImportError:
+    from django.core.urlresolvers import NoReverseMatch
+
+from composer.tests.models import DummyModel1, DummyModel2
+from composer.utils import (
+    LRUCache, clear_template_caches, get_style_template, get_target_template,
+    get_template_slot_names, resolve_view_name
+)
+
+
+class LRUCacheTestCase(SimpleTestCase):
+
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(cache.get("a"), 1)
+        cache.set("c", 3)
+        self.assertEqual(cache.get("b"), None)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+
+class TemplateSlotNamesTestCase(SimpleTestCase):
+
+    def get_slot_names(self, template_name):
+        return get_template_slot_names(
+            loader.get_template(template_name).template
+        )
+
+    def test_inheritance(self):
+        self.assertEqual(
+            self.get_slot_names("tests/home.html"),
+            ("header", "content", "footer")
+        )
+
+        # The content block is overridden
+        self.assertEqual(
+            self.get_slot_names("tests/aaa.html"), ("header", "footer")
+        )
+        self.assertEqual(
+            self.get_slot_names("tests/slot_context.html"),
+            ("default_slot_context", "header", "footer")
+        )
+
+
+class ResolveViewNameTestCase(SimpleTestCase):
+
+    def test_memoized(self):
+        view, args, kwargs = resolve_view_name("header")
+        self.assertEqual(
+            view.view_initkwargs["template_name"], "tests/header.html"
+        )
+        self.assertIs(
+            resolve_view_name("header"), resolve_view_name("header")
+        )
+        self.assertRaises(NoReverseMatch, resolve_view_name, "does-not-exist")
+
+    def test_no_reverse_match_is_new(self):
+        errors = []
+        for i in range(2):
+            try:
+                resolve_view_name("does-not-exist")
+            except NoReverseMatch as exc:
+                errors.append(exc)
+        self.assertIsNot(errors[0], errors[1])
+        self.assertEqual(str(errors[0]), str(errors[1]))
+
+    def test_urlconf_changed(self):
+        resolve_view_name("header")
+        with self.settings(ROOT_URLCONF="composer.tests.urls_empty"):
+            self.assertRaises(NoReverseMatch, resolve_view_name, "header")
+        self.assertEqual((), resolve_view_name("header")[1])
+
+
+class TemplateCachesTestCase(SimpleTestCase):
+
+    def test_target_template(self):
+        template = get_target_template(DummyModel2, "tile")
+        self.assertEqual(
+            template.template.name, "tests/inclusion_tags/dummymodel2_tile.html"
+        )
+        self.assertIs(get_target_template(DummyModel2, "tile"), template)
+
+        # Missing templates are remembered too
+        self.assertIsNone(get_target_template(DummyModel1, "tile"))
+
+        clear_template_caches()
+        self.assertIsNot(get_target_template(DummyModel2, "tile"), template)
+
+    def test_style_template(self):
+        template = get_style_template("tile")
+        self.assertEqual(template.template.name, "composer/inclusion_tags/tile.html")
+        self.assertIs(get_style_template("tile"), template)
+        self.assertIsNone(get_style_template("does_not_exist"))
+
+    @override_settings(DEBUG=True)
+    def test_debug(self):
+        # Templates may be edited unless Django reports changed templates
+        clear_template_caches()
+        template = get_style_template("tile")
+        if django.VERSION >= (3, 2):
+            self.assertIs(get_style_template("tile"), template)
+        else:
+            self.assertIsNot(get_style_template("tile"), template)
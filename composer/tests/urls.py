@@ -1,7 +1,9 @@
+import sys
+
 from django.conf.urls import url, include
 from django.views.generic.base import TemplateView
 
-from composer.tests.views import DummyModel1View
+from composer.tests.views import DummyModel1View, quick, slow, view_kwargs
 
 
 urlpatterns = [
@@ -30,9 +32,17 @@ urlpatterns = [
         TemplateView.as_view(template_name="tests/bbb.html"),
         name="bbb"
     ),
+    url(r"^slow/$", slow, name="slow"),
+    url(r"^quick/$", quick, name="quick"),
+    url(r"^view-kwargs/$", view_kwargs, name="view_kwargs"),
+    url(r"^composer/", include("composer.urls")),
     url(
         r"^slot-context/$",
         TemplateView.as_view(template_name="tests/slot_context.html"),
         name="slot_context"
     ),
 ]
+
+if sys.version_info >= (3, 5):
+    from composer.tests.aio_views import async_view
+    urlpatterns.append(url(r"^async/$", async_view, name="async"))
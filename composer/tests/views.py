@@ -1,3 +1,6 @@
+import time
+
+from django.http import HttpResponse
 from django.views.generic.detail import DetailView
 
 from composer.tests.models import DummyModel1
@@ -6,3 +9,19 @@ from composer.tests.models import DummyModel1
 class DummyModel1View(DetailView):
     model = DummyModel1
     template_name = "tests/dummymodel1_detail.html"
+
+
+def slow(request, **kwargs):
+    time.sleep(0.5)
+    return HttpResponse("<div id=\"content\">I am slow</div>")
+
+
+def quick(request, **kwargs):
+    time.sleep(0.1)
+    return HttpResponse("<div id=\"content\">I am quick</div>")
+
+
+def view_kwargs(request, **kwargs):
+    return HttpResponse(
+        "<div id=\"content\">%s</div>" % " ".join(sorted(kwargs))
+    )
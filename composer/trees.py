@@ -0,0 +1,66 @@
+"""Cache the rows, columns and tiles of slots in the Django cache.
+
+Layouts change rarely, so the tree of a slot is stored in the compact form
+produced by dump_rows. A slot's tree is versioned and the version is bumped
+whenever the slot or anything in it changes.
+"""
+from composer.caching import (
+    acquire_lock, bump_version, get_cache, get_versions, is_fresh, make_key,
+    release_lock, set_many_packed, wait_for
+)
+from composer.models import assemble_rows, dump_rows, fetch_tiles
+from composer.utils import get_setting
+
+
+# Bump when the form of the output of dump_rows changes
+FORMAT = 7
+
+
+def get_rows(slots):
+    """Return a dictionary of slot id to rows like build_rows, but take the
+    rows, columns and tiles from the cache where possible. Only one process
+    fetches an out of date tree. Others use the previous tree meanwhile.
+    """
+
+    cache = get_cache()
+    keys = [make_key("tree", FORMAT, slot.id) for slot in slots]
+    versions = get_versions([("tree", slot.id) for slot in slots])
+    cached = cache.get_many(keys)
+
+    dumped = {}
+    missing = []
+    locked = []
+    for slot, key, version in zip(slots, keys, versions):
+        value = cached.get(key)
+        if is_fresh(value, version):
+            dumped[slot.id] = value[1]
+        elif acquire_lock(key):
+            missing.append((slot, key, version))
+            locked.append(key)
+        elif value is not None:
+            dumped[slot.id] = value[1]
+        else:
+            value = wait_for(key, version)
+            if value is not None:
+                dumped[slot.id] = value[1]
+            else:
+                missing.append((slot, key, version))
+
+    if missing:
+        try:
+            missing_slots = [slot for slot, key, version in missing]
+            fetched = dump_rows(missing_slots, fetch_tiles(missing_slots))
+            set_many_packed([
+                (key, version, fetched[slot.id])
+                for slot, key, version in missing
+            ], get_setting("tree-cache-timeout", 86400))
+        finally:
+            for key in locked:
+                release_lock(key)
+        dumped.update(fetched)
+
+    return assemble_rows(dumped)
+
+
+def invalidate_tree(slot_id):
+    bump_version("tree", slot_id)
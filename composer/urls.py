@@ -0,0 +1,8 @@
+from django.conf.urls import url
+
+from composer.views import TileView
+
+
+urlpatterns = [
+    url(r"^tile/(?P<pk>\d+)/$", TileView.as_view(), name="composer-tile"),
+]
@@ -1,8 +1,30 @@
+import threading
+import weakref
+from collections import OrderedDict
 from importlib import import_module
 
+try:
+    string_types = (str, unicode)
+except NameError:
+    string_types = (str,)
+
 
 _composer_utils_cache = {}
 
+# Key is a compiled template, value is a tuple of slot names
+_template_slot_names = weakref.WeakKeyDictionary()
+
+
+def get_setting(name, default=None):
+    """Return a key from the COMPOSER setting, or default if it is not set."""
+
+    # Must import late
+    from django.conf import settings
+    try:
+        return settings.COMPOSER[name]
+    except (AttributeError, KeyError):
+        return default
+
 
 def _build_view_names_recurse(url_patterns=None, namespace=None):
     """Returns a tuple of url pattern names suitable for use as field choices.
@@ -38,6 +60,193 @@ def _build_view_names_recurse(url_patterns=None, namespace=None):
     return result
 
 
+def _collect_slot_names(nodelist, overridden, result):
+    # Must import late
+    from django.template.loader_tags import BlockNode
+    from composer.templatetags.composer_tags import ComposerNode
+
+    for node in nodelist:
+        # Blocks overridden by a child template never render
+        if isinstance(node, BlockNode) and (node.name in overridden):
+            continue
+        if isinstance(node, ComposerNode) and (node.slot_name not in result):
+            result.append(node.slot_name)
+        for attr in node.child_nodelists:
+            child_nodelist = getattr(node, attr, None)
+            if child_nodelist:
+                _collect_slot_names(child_nodelist, overridden, result)
+
+
+def get_template_slot_names(template):
+    """Return the slot names of the composer tags that may render for a
+    compiled template, in order of appearance. The template inheritance chain
+    is followed as far as parent names are constants.
+    """
+
+    try:
+        return _template_slot_names[template]
+    except KeyError:
+        pass
+
+    # Must import late
+    from django.template import TemplateDoesNotExist
+    from django.template.base import VariableNode
+    from django.template.loader_tags import BlockNode, ExtendsNode
+
+    result = []
+    overridden = set()
+    history = [template.origin]
+    current = template
+    while current is not None:
+        _collect_slot_names(current.nodelist, overridden, result)
+
+        # A block that renders its parent with block.super does not hide it
+        for block in current.nodelist.get_nodes_by_type(BlockNode):
+            uses_super = False
+            for node in block.nodelist.get_nodes_by_type(VariableNode):
+                if node.filter_expression.token.startswith("block.super"):
+                    uses_super = True
+            if not uses_super:
+                overridden.add(block.name)
+
+        parent = None
+        extends = current.nodelist.get_nodes_by_type(ExtendsNode)
+        if extends and not extends[0].parent_name.filters \
+                and isinstance(extends[0].parent_name.var, string_types):
+            try:
+                parent, origin = current.engine.find_template(
+                    extends[0].parent_name.var, skip=history
+                )
+                history.append(origin)
+            except TemplateDoesNotExist:
+                pass
+        current = parent
+
+    result = tuple(result)
+    _template_slot_names[template] = result
+    return result
+
+
+def resolve_view_name(view_name):
+    """Return a tuple (view, args, kwargs) for a view name. The result is
+    remembered until the URLconf changes. Raises NoReverseMatch.
+    """
+
+    # Must import late
+    try:
+        from django.urls import NoReverseMatch, get_urlconf, resolve, reverse
+    except ImportError:
+        from django.core.urlresolvers import (
+            NoReverseMatch, get_urlconf, resolve, reverse
+        )
+
+    registry = _composer_utils_cache.setdefault("resolve_view_name", {})
+    key = (get_urlconf(), view_name)
+    try:
+        result = registry[key]
+    except KeyError:
+        # Failures are remembered as the message. Raising the same exception
+        # instance again would grow its traceback on every lookup.
+        try:
+            match = resolve(reverse(view_name))
+            result = (match.func, match.args, match.kwargs)
+        except NoReverseMatch as exc:
+            result = str(exc)
+        registry[key] = result
+
+    if isinstance(result, string_types):
+        raise NoReverseMatch(result)
+    return result
+
+
+def clear_url_caches():
+    """Forget everything derived from the URLconf."""
+    _composer_utils_cache.pop("resolve_view_name", None)
+    _composer_utils_cache.pop("get_view_choices", None)
+
+
+def use_template_caches():
+    """Compiled templates are kept until the templates change. With DEBUG on
+    templates may be edited while the server runs, so they are only kept if
+    Django's autoreloader announces changed templates, which it does from
+    Django 3.2.
+    """
+
+    # Must import late
+    import django
+    from django.conf import settings
+    return (not settings.DEBUG) or (django.VERSION >= (3, 2))
+
+
+def get_target_template(model, style):
+    """Return the compiled template to render a target tile of the given
+    model and style with, or None if there is none. Template names follow
+    Django naming conventions, but also traverse upwards over the inheritance
+    hierarchy. The result is remembered until the templates change.
+    """
+
+    # Must import late
+    from django.db import models
+    from django.template import TemplateDoesNotExist, loader
+
+    registry = _composer_utils_cache.setdefault("get_target_template", {})
+    key = (model, style)
+    try:
+        return registry[key]
+    except KeyError:
+        pass
+
+    template_names = []
+    kls = model
+    while issubclass(kls, models.Model) and (kls is not models.Model):
+        # Generic foreign keys use the content type of the concrete model
+        opts = kls._meta.concrete_model._meta
+        template_names.extend((
+            "%s/inclusion_tags/%s_%s.html" % \
+                (opts.app_label, opts.model_name, style),
+            "%s/inclusion_tags/%s.html" % (opts.app_label, style),
+        ))
+        kls = kls.__bases__[0]
+
+    try:
+        template = loader.select_template(template_names)
+    except TemplateDoesNotExist:
+        template = None
+    if use_template_caches():
+        registry[key] = template
+    return template
+
+
+def get_style_template(style):
+    """Return the compiled template that wraps the content of tiles with the
+    given style, or None if there is none. The result is remembered until the
+    templates change.
+    """
+
+    # Must import late
+    from django.template import TemplateDoesNotExist, loader
+
+    registry = _composer_utils_cache.setdefault("get_style_template", {})
+    try:
+        return registry[style]
+    except KeyError:
+        pass
+
+    try:
+        template = loader.get_template("composer/inclusion_tags/%s.html" % style)
+    except TemplateDoesNotExist:
+        template = None
+    if use_template_caches():
+        registry[style] = template
+    return template
+
+
+def clear_template_caches():
+    """Forget all compiled templates."""
+    _composer_utils_cache.pop("get_target_template", None)
+    _composer_utils_cache.pop("get_style_template", None)
+
+
 def get_view_choices():
     # Implement a simple module level cache. The result never changes
     # for the duration of the Django process life.
@@ -46,3 +255,43 @@ def get_view_choices():
         result.sort()
         _composer_utils_cache["get_view_choices"] = result
     return _composer_utils_cache["get_view_choices"]
+
+
+class LRUCache(object):
+    """A bounded thread safe mapping that discards the least recently used
+    key once it is full. Hits and misses are counted to allow tuning of the
+    size.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            # Re-insert to mark as most recently used
+            self._data[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = value
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
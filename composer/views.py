@@ -1,7 +1,11 @@
+from django.contrib.sites.shortcuts import get_current_site
 from django.shortcuts import get_object_or_404
+from django.utils.cache import (
+    add_never_cache_headers, patch_response_headers, patch_vary_headers
+)
 from django.views.generic.detail import DetailView
 
-from composer.models import Slot
+from composer.models import Slot, Tile
 
 
 class SlotView(DetailView):
@@ -11,6 +15,9 @@ class SlotView(DetailView):
 
     model = Slot
 
+    # The slot may be passed in by whoever already fetched it
+    slot = None
+
     def dispatch(self, request, *args, **kwargs):
         # Always return the get method's response, except if this view manages
         # to trigger the method not allowed code path.
@@ -25,10 +32,43 @@ class SlotView(DetailView):
             return handler
 
     def get_object(self):
+        if self.slot is not None:
+            return self.slot
+
         # Return the slot based on the path
-        url = self.request.path_info
         return get_object_or_404(
             Slot.permitted,
             url=self.request.path_info,
             slot_name="content"
         )
+
+
+class TileView(DetailView):
+    """Render a single tile of a slot on the current site. Deferred tiles are
+    loaded from this view.
+    """
+
+    template_name = "composer/tile_detail.html"
+    context_object_name = "tile"
+
+    def get_queryset(self):
+        return Tile.objects.filter(
+            column__row__slot__sites__id__exact=get_current_site(self.request).id
+        ).distinct()
+
+    def get(self, request, *args, **kwargs):
+        # Tell the tile tag to render the tile instead of a placeholder
+        request._composer_render_deferred = True
+        response = super(TileView, self).get(request, *args, **kwargs)
+        tile = self.object
+        if tile.cache_timeout and not tile.uncacheable:
+            patch_response_headers(response, tile.cache_timeout)
+            vary = (tile.cache_vary or "").split(",")
+            if "language" in vary:
+                patch_vary_headers(response, ["Accept-Language"])
+            if "authentication" in vary:
+                patch_vary_headers(response, ["Cookie"])
+        else:
+            # Do not let caches store tiles that may differ per request
+            add_never_cache_headers(response)
+        return response
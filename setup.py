@@ -15,7 +15,6 @@ setup(
         "django-crum",
         "django-nested-admin",
         "django-simplemde>=0.1.2",
-        "beautifulsoup4",
         "markdown",
     ],
     include_package_data=True,